@@ -7,6 +7,9 @@ Coordinates email processing, AI analysis, and family communication
 import sys
 import os
 import logging
+import queue
+from logging.handlers import RotatingFileHandler
+import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -18,20 +21,50 @@ from gmail_connector import GmailConnector
 from ai_analyzer import AIAnalyzer
 from summary_generator import SummaryGenerator
 
+# Single log file, rotated by size rather than named by date
+_LOG_PATH = Path("output/logs") / "sally.log"
+
 def setup_logging():
     """Configure logging for production monitoring"""
-    log_path = Path("output/logs")
-    log_path.mkdir(parents=True, exist_ok=True)
+    # Already configured earlier in this process - keep the existing handlers
+    if logging.getLogger().handlers:
+        return
+    
+    _LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler(log_path / f"sally_{datetime.now().strftime('%Y%m%d')}.log"),
+            RotatingFileHandler(_LOG_PATH, maxBytes=50_000_000, backupCount=7, encoding='utf-8'),
             logging.StreamHandler()
         ]
     )
 
+def prefetch(iterable, depth=2):
+    """Iterate in a background thread, staying at most `depth` items ahead of the consumer"""
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    
+    def produce():
+        try:
+            for item in iterable:
+                buffer.put(item)
+        except BaseException as e:  # Including KeyboardInterrupt/SystemExit - re-raised by the consumer
+            buffer.put(e)
+        finally:
+            buffer.put(done)  # Always, or the consumer would wait forever
+    
+    threading.Thread(target=produce, daemon=True).start()
+    
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
 def main():
     """Sally 3.0 Main Production Controller"""
     
@@ -108,16 +141,24 @@ def process_emails(config, gmail, logger):
     
     days_since_start = (now - academic_start).days
     
-    # Fetch and analyze emails
-    emails = gmail.get_school_emails(days_back=days_since_start, max_results=100)
-    if not emails:
+    # Fetch and analyze emails page by page; the next page downloads
+    # while the current one is being analyzed
+    pages = gmail.iter_school_emails(days_back=days_since_start, page_size=50, max_results=100)
+    
+    email_count = 0
+    urgent_emails = []
+    for emails in prefetch(pages):
+        email_count += len(emails)
+        analyzed_emails = analyzer.analyze_email_batch(emails)
+        
+        # Only urgent items are kept once a page is analyzed
+        urgent_emails.extend(analyzer.get_urgent_emails(analyzed_emails))
+    
+    if not email_count:
         logger.info("No emails to process")
         return 0
     
-    analyzed_emails = analyzer.analyze_email_batch(emails)
-    
     # Check for urgent items
-    urgent_emails = analyzer.get_urgent_emails(analyzed_emails)
     if urgent_emails:
         logger.warning(f"Found {len(urgent_emails)} urgent emails")
         # Send urgent alerts here if configured
@@ -129,7 +170,8 @@ def generate_weekly_summary(config, gmail, logger):
     logger.info("Generating weekly summary...")
     
     summary_gen = SummaryGenerator(config, gmail)
-    summary_data = summary_gen.generate_weekly_summary()
+    # Always fresh - a summary cached earlier today would miss emails that arrived since
+    summary_data = summary_gen.generate_weekly_summary(use_cache=False)
     
     # Send summary email if recipients configured
     if config.recipients.get('summary'):
@@ -146,7 +188,8 @@ def check_urgent_emails(config, gmail, logger):
     logger.info("Checking for urgent emails...")
     
     analyzer = AIAnalyzer(config)
-    emails = gmail.get_school_emails(days_back=3, max_results=20)  # Last 3 days only
+    # Last 3 days only; every school email goes to the analyzer, which decides urgency
+    emails = gmail.get_school_emails(days_back=3, max_results=20)
     
     if emails:
         analyzed_emails = analyzer.analyze_email_batch(emails)
@@ -168,7 +211,7 @@ def send_test_summary(config, gmail, logger):
     logger.info("Generating test summary...")
     
     summary_gen = SummaryGenerator(config, gmail)
-    summary_data = summary_gen.generate_weekly_summary(days_back=7)  # Last week
+    summary_data = summary_gen.generate_weekly_summary(days_back=7, use_cache=False)  # Last week, fresh
     
     # Always try to send regardless of configuration
     success = summary_gen.send_weekly_summary_email(summary_data)
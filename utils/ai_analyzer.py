@@ -11,17 +11,155 @@ EDUCATIONAL CONCEPTS:
 
 import json
 import re
+import time
+import logging
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from pathlib import Path
 import anthropic
 from anthropic import Anthropic
 import os
 from dotenv import load_dotenv
 
+# Load .env once at import so API keys are available to every analyzer
+load_dotenv()
+
+logger = logging.getLogger("Sally.AIAnalyzer")
+
+# Optional: pyahocorasick finds every category keyword in one pass over the text
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: numba JIT-compiles the bulk rule-based scoring kernel
+try:
+    import numpy as np
+    from numba import njit, prange
+    _NUMBA = True
+except ImportError:
+    _NUMBA = False
+
 # We'll add AI service imports after setting up API keys
 # import anthropic  # Claude AI
 # import openai     # GPT AI
 
+# Invariant response instructions, sent as part of the cached system prompt
+ANALYSIS_INSTRUCTIONS = """
+Analyze the school communication in the user message and record the result with the provided tool.
+
+Focus on: supportive language, privacy protection, partnership mindset."""
+
+# Structured output schema for one email, enforced through Claude tool use
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "category": {"type": "string", "enum": ["Academic", "Administrative", "Financial", "Behavioral", "Calendar"]},
+        "urgency_score": {"type": "number", "description": "0.0-10.0"},
+        "student_association": {"type": "string", "description": "Coded student name(s), or All Students"},
+        "key_dates": {"type": "array", "items": {"type": "string"}},
+        "action_required": {"type": "boolean"},
+        "summary": {"type": "string", "description": "One sentence family-friendly summary"},
+        "reasoning": {"type": "string", "description": "Brief explanation of categorization"}
+    },
+    "required": ["category", "urgency_score", "student_association", "key_dates",
+                 "action_required", "summary", "reasoning"]
+}
+
+ANALYSIS_TOOL = {
+    "name": "record_email_analysis",
+    "description": "Record the structured analysis of one school email",
+    "input_schema": ANALYSIS_SCHEMA
+}
+
+BATCH_ANALYSIS_TOOL = {
+    "name": "record_email_analyses",
+    "description": "Record the structured analysis of several school emails, one entry per email in order",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "analyses": {"type": "array", "items": ANALYSIS_SCHEMA}
+        },
+        "required": ["analyses"]
+    }
+}
+
+PROMPT_CACHING_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+# How many emails to send to Claude in a single request
+ANALYSIS_BATCH_SIZE = 15
+
+# Characters of email content sent to Claude for one email alone / per email in a batch
+CONTENT_CHARS = 800
+BATCH_CONTENT_CHARS = 600
+
+# Output budget per analyzed email - room for the full tool input including reasoning
+MAX_TOKENS_PER_EMAIL = 350
+
+# How many Claude requests may be in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Retries (with exponential backoff) when Claude reports a rate limit
+RATE_LIMIT_RETRIES = 4
+
+# On-disk cache of AI analyses, keyed by a hash of the email content
+ANALYSIS_CACHE_PATH = Path("output/cache/analysis.db")
+
+# Patterns for rule-based key information extraction, compiled once
+_DATE_RE = re.compile(
+    r'\b(?:\d{1,2}/\d{1,2}/\d{4}'     # MM/DD/YYYY
+    r'|\d{1,2}-\d{1,2}-\d{4}'          # MM-DD-YYYY
+    r'|[A-Za-z]+ \d{1,2},? \d{4})\b'   # Month DD, YYYY
+)
+_AMOUNT_RE = re.compile(r'\$\d+\.?\d*')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+
+# A sentence (text between periods) containing an action word; matches may only
+# start at a sentence boundary, which keeps the scan linear
+_ACTION_RE = re.compile(r'(?:^|(?<=\.))([^.]*\b(?:please|must|need to|required to|should)\b[^.]*)')
+
+# Potentially concerning terms and their supportive alternatives for summaries
+_SUPPORTIVE = {
+    'failing': 'needs support',
+    'poor behavior': 'behavioral growth opportunity',
+    'discipline': 'guidance',
+    'problem': 'area for development',
+    'concerning': 'worth discussing'
+}
+_SUPPORTIVE_RE = re.compile('|'.join(re.escape(term) for term in sorted(_SUPPORTIVE, key=len, reverse=True)))
+
+if _NUMBA:
+    @njit(parallel=True, cache=True)
+    def _aggregate_scores(doc_offsets, cat_ids, counts, weights, bonuses, n_cats, default_cat):
+        """
+        Reduce flat per-document keyword hits to (best category, urgency score)
+        Hits for document d live in [doc_offsets[d], doc_offsets[d + 1]);
+        cat_ids[h] < 0 marks an urgency phrase worth weights[h]
+        """
+        n_docs = doc_offsets.shape[0] - 1
+        best = np.empty(n_docs, np.int64)
+        urgency = np.empty(n_docs, np.float64)
+        
+        for d in prange(n_docs):
+            scores = np.zeros(n_cats, np.int64)
+            total = bonuses[d]
+            for h in range(doc_offsets[d], doc_offsets[d + 1]):
+                if cat_ids[h] >= 0:
+                    scores[cat_ids[h]] += counts[h]
+                else:
+                    total += weights[h]
+            
+            # argmax keeps the first category on ties, like max() over the dict
+            best[d] = np.argmax(scores) if scores.max() > 0 else default_cat
+            urgency[d] = min(total, 10.0)
+        
+        return best, urgency
+
 class AIAnalyzer:
     """
     Analyzes school emails using AI to categorize, extract info, and detect urgency
@@ -31,6 +169,7 @@ class AIAnalyzer:
     def __init__(self, config_manager):
         self.config = config_manager
         self.ai_client = None
+        self._api_key = os.getenv('ANTHROPIC_API_KEY')
         
         # Email categories Sally understands
         self.categories = {
@@ -41,6 +180,30 @@ class AIAnalyzer:
             'Calendar': ['event', 'schedule', 'date', 'time', 'holiday', 'break', 'trip'],
             'Urgent': ['urgent', 'immediate', 'ASAP', 'deadline', 'today', 'tomorrow', 'required']
         }
+        self._categories_lc = {category: tuple(keyword.lower() for keyword in keywords)
+                               for category, keywords in self.categories.items()}
+        self._category_matcher = self._build_category_matcher()
+        
+        # Urgency phrases by points awarded when present
+        self.urgency_indicators = {
+            # High urgency indicators
+            3.0: ['urgent', 'immediate', 'asap', 'emergency', 'important',
+                  'deadline', 'due today', 'due tomorrow', 'overdue',
+                  'suspended', 'incident', 'injury', 'medical', 'principal office'],
+            # Medium urgency indicators
+            2.0: ['payment due', 'meeting required', 'response needed',
+                  'please respond', 'action required', 'sign up',
+                  'permission slip', 'field trip'],
+            # Time-sensitive indicators
+            1.5: ['today', 'tomorrow', 'this week', 'deadline',
+                  'expires', 'closes', 'ends']
+        }
+        self._urgency_weights, self._urgency_re = self._build_urgency_matcher()
+        
+        # Student name/grade regex, built on first use once students are loaded
+        # (and rebuilt when the config's students change)
+        self._student_matcher = None
+        self._student_matcher_for = None   # The students view the matcher was built from
         
         # Educational Psychology Guidelines for AI Processing
         self.educational_principles = {
@@ -51,7 +214,18 @@ class AIAnalyzer:
             'collaborative_approach': 'frame as school-family partnership'
         }
         
+        # Static system prompt, built once so Claude can cache it across emails.
+        # Keep it free of per-email data and timestamps or the cache misses.
+        self._cached_system_prompt = self.get_educational_prompt_context() + ANALYSIS_INSTRUCTIONS
+        
+        # Newsletters and templated notices repeat, so remember past AI analyses
+        self._cache_lock = threading.Lock()
+        self._analysis_cache = self._open_analysis_cache()
+        
         print("🧠 AI Analyzer initialized with educational psychology awareness")
+        
+        # Connect to Claude up front so analysis never has to
+        self.setup_ai_client()
     
     def get_educational_prompt_context(self) -> str:
         """
@@ -96,13 +270,8 @@ This analysis will help parents stay informed and engaged in their children's ed
         """
         Initialize Claude AI client for intelligent email analysis
         """
-        if not api_key:
-            # Try to get from environment
-            import os
-            from dotenv import load_dotenv
-            
-            load_dotenv()  # Load .env file
-            api_key = os.getenv('ANTHROPIC_API_KEY')
+        # Fall back to the key found in the environment / .env file
+        api_key = api_key or self._api_key
         
         if not api_key:
             print("❌ No Anthropic API key found. Please add to .env file.")
@@ -119,60 +288,192 @@ This analysis will help parents stay informed and engaged in their children's ed
             print(f"❌ Failed to initialize Claude: {str(e)}")
             return False
 
+    def _create_message(self, **kwargs):
+        """
+        Call Claude, backing off and retrying when we hit the rate limit
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                return self.ai_client.messages.create(**kwargs)
+            except anthropic.RateLimitError:
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                delay = 2 ** attempt
+                print(f"   ⏳ Rate limited by Claude, retrying in {delay}s...")
+                time.sleep(delay)
+
+    def _open_analysis_cache(self) -> Optional[sqlite3.Connection]:
+        """
+        Open (or create) the SQLite cache of previous AI analyses
+        Sally keeps working without it if the database can't be opened
+        """
+        try:
+            ANALYSIS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(ANALYSIS_CACHE_PATH, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, analysis TEXT NOT NULL)")
+            db.commit()
+            return db
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Analysis cache unavailable: {str(e)}")
+            return None
+
+    @staticmethod
+    def _analysis_cache_key(email_text: str, email_subject: str) -> str:
+        """
+        Hash of the content Claude sees - pass email_text already cut to what is sent;
+        case and whitespace are normalized so reformatted copies of the same notice share one entry
+        """
+        content = ' '.join(f"{email_subject}|{email_text}".lower().split())
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _get_cached_analysis(self, key: str) -> Optional[Dict]:
+        if not self._analysis_cache:
+            return None
+        with self._cache_lock:
+            row = self._analysis_cache.execute(
+                "SELECT analysis FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _store_cached_analysis(self, key: str, analysis: Dict):
+        if not self._analysis_cache:
+            return
+        with self._cache_lock:
+            self._analysis_cache.execute(
+                "INSERT OR REPLACE INTO analyses (key, analysis) VALUES (?, ?)",
+                (key, json.dumps(analysis))
+            )
+            self._analysis_cache.commit()
+
+    def _system_blocks(self) -> List[Dict]:
+        """
+        System prompt blocks marked for Anthropic prompt caching
+        Tool definitions precede the system prompt, so this breakpoint caches them too
+        """
+        return [{
+            "type": "text",
+            "text": self._cached_system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
+
     def analyze_with_ai(self, email_text: str, email_subject: str) -> Dict:
         """
         Use Claude AI for intelligent email analysis
         Designed for token efficiency while maintaining accuracy
         """
+        cache_key = self._analysis_cache_key(email_text[:CONTENT_CHARS], email_subject)
+        cached = self._get_cached_analysis(cache_key)
+        if cached is not None:
+            return cached
+        
         if not self.ai_client:
             print("⚠️ AI client not initialized, using rule-based analysis")
             return self._fallback_analysis(email_text, email_subject)
         
-        # Create token-efficient prompt
-        educational_context = self.get_educational_prompt_context()
-        
-        # Concise, structured prompt for consistent results
-        prompt = f"""{educational_context}
-
-    EMAIL TO ANALYZE:
-    Subject: {email_subject}
-    Content: {email_text[:800]}...
-
-    Please analyze this school communication and respond in this exact JSON format:
-    {{
-        "category": "Academic/Administrative/Financial/Behavioral/Calendar",
-        "urgency_score": 0.0-10.0,
-        "student_association": "Student_Alpha/Student_Beta/Student_Gamma/All Students",
-        "key_dates": ["date1", "date2"],
-        "action_required": true/false,
-        "summary": "One sentence family-friendly summary",
-        "reasoning": "Brief explanation of categorization"
-    }}
-
-    Focus on: supportive language, privacy protection, partnership mindset."""
+        # Only the per-email part goes in the user turn; the educational
+        # context lives in the cached system prompt, the format in the tool
+        prompt = f"""EMAIL TO ANALYZE:
+Subject: {email_subject}
+Content: {email_text[:CONTENT_CHARS]}"""
 
         try:
             # Call Claude with minimal tokens
-            response = self.ai_client.messages.create(
+            response = self._create_message(
                 model="claude-3-haiku-20240307",  # Most cost-effective model
-                max_tokens=200,  # Keep response concise
+                max_tokens=MAX_TOKENS_PER_EMAIL,
+                temperature=0,  # Deterministic output for consistent categorization
+                system=self._system_blocks(),
+                tools=[ANALYSIS_TOOL],
+                tool_choice={"type": "tool", "name": ANALYSIS_TOOL["name"]},
                 messages=[{
                     "role": "user", 
                     "content": prompt
-                }]
+                }],
+                extra_headers=PROMPT_CACHING_HEADERS
             )
             
-            # Parse JSON response
-            import json
-            ai_analysis = json.loads(response.content[0].text)
+            # Structured tool input - no free-form JSON to parse
+            ai_analysis = self._tool_input(response, ANALYSIS_TOOL["name"])
+            self._store_cached_analysis(cache_key, ai_analysis)
             
-            print(f"   🤖 AI analysis complete (tokens used: ~{len(prompt.split())*1.3:.0f})")
+            print("   🤖 AI analysis complete")
             return ai_analysis
             
         except Exception as e:
             print(f"   ⚠️ AI analysis failed: {str(e)}, using fallback")
             return self._fallback_analysis(email_text, email_subject)
 
+    def analyze_with_ai_batch(self, emails: List[Dict]) -> List[Dict]:
+        """
+        Analyze several emails with a single Claude request
+        Returns one analysis per email, in the same order; raises on a bad response
+        Emails analyzed before are answered from the cache and not sent to Claude
+        """
+        analyses = [None] * len(emails)
+        misses = []  # (position, cache key, subject, content) for emails Claude must analyze
+        
+        for position, email in enumerate(emails):
+            subject = email.get('subject', '')
+            content = self._email_text(email)[:BATCH_CONTENT_CHARS]
+            cache_key = self._analysis_cache_key(content, subject)
+            cached = self._get_cached_analysis(cache_key)
+            if cached is not None:
+                analyses[position] = cached
+            else:
+                misses.append((position, cache_key, subject, content))
+        
+        if not misses:
+            return analyses
+        
+        sections = []
+        for i, (_, _, subject, content) in enumerate(misses, 1):
+            sections.append(f"[{i}] Subject: {subject}\nContent: {content}")
+        
+        prompt = (f"Analyze the following {len(misses)} emails. Record exactly "
+                  f"{len(misses)} analyses, in the same order.\n\n"
+                  + "\n\n".join(sections))
+        
+        response = self._create_message(
+            model="claude-3-haiku-20240307",
+            max_tokens=MAX_TOKENS_PER_EMAIL * len(misses),
+            temperature=0,
+            system=self._system_blocks(),
+            tools=[BATCH_ANALYSIS_TOOL],
+            tool_choice={"type": "tool", "name": BATCH_ANALYSIS_TOOL["name"]},
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }],
+            extra_headers=PROMPT_CACHING_HEADERS
+        )
+        
+        ai_results = self._tool_input(response, BATCH_ANALYSIS_TOOL["name"]).get('analyses')
+        if not isinstance(ai_results, list) or len(ai_results) != len(misses):
+            raise ValueError(f"expected {len(misses)} analyses in response")
+        
+        for (position, cache_key, _, _), ai_result in zip(misses, ai_results):
+            self._store_cached_analysis(cache_key, ai_result)
+            analyses[position] = ai_result
+        
+        return analyses
+
+    @staticmethod
+    def _tool_input(response, tool_name: str) -> Dict:
+        """
+        Pull the structured input of the forced tool call out of a Claude response
+        """
+        for block in response.content:
+            if block.type == "tool_use" and block.name == tool_name:
+                return block.input
+        raise ValueError(f"Claude did not call {tool_name}")
+
+    @staticmethod
+    def _email_text(email: Dict) -> str:
+        """
+        The email content sent to Claude for analysis
+        """
+        return f"{email.get('body_text', '')} {email.get('snippet', '')}"
+
     def _fallback_analysis(self, email_text: str, email_subject: str) -> Dict:
         """
         Fallback to rule-based analysis if AI fails
@@ -199,88 +500,225 @@ This analysis will help parents stay informed and engaged in their children's ed
         """
         print(f"🧠 Analyzing {len(emails)} school emails...")
         
-        analyzed_emails = []
+        # All emails in one batch share the same analysis time
+        batch_ts = datetime.now()
         
-        for i, email in enumerate(emails, 1):
-            print(f"   📧 Processing email {i}/{len(emails)}: {email['subject'][:50]}...")
+        if self.ai_client:
+            analyzed_emails = []
+            chunks = [emails[start:start + ANALYSIS_BATCH_SIZE]
+                      for start in range(0, len(emails), ANALYSIS_BATCH_SIZE)]
             
-            # Analyze this email
-            analysis = self.analyze_single_email(email)
+            # Claude calls are network-bound, so keep several chunks in flight
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                chunk_analyses = list(executor.map(lambda chunk: self._analyze_chunk(chunk, batch_ts), chunks))
             
-            # Add analysis to the email data
-            email_with_analysis = {**email, **analysis}
-            analyzed_emails.append(email_with_analysis)
-            
-            print(f"      📊 Category: {analysis['category']}")
-            print(f"      🚨 Urgency: {analysis['urgency_score']:.1f}/10")
-            print(f"      👤 Student: {analysis['student_association']}")
+            for chunk, analyses in zip(chunks, chunk_analyses):
+                for email, analysis in zip(chunk, analyses):
+                    # Add analysis to the email data
+                    analyzed_emails.append({**email, **analysis})
+        else:
+            # No AI available - score the whole batch with rules in one go
+            analyzed_emails = self.analyze_email_batch_fast(emails, batch_ts)
+        
+        # Per-email detail is debug-level; console output stays one line per batch
+        if logger.isEnabledFor(logging.DEBUG):
+            for analysis in analyzed_emails:
+                logger.debug("%s | Category: %s | Urgency: %.1f/10 | Student: %s",
+                             analysis['subject'][:50], analysis['category'],
+                             analysis['urgency_score'], analysis['student_association'])
         
         print(f"✅ Email analysis complete!")
         return analyzed_emails
     
-    def analyze_single_email(self, email: Dict) -> Dict:
+    def analyze_email_batch_fast(self, emails: List[Dict], batch_ts: Optional[datetime] = None) -> List[Dict]:
         """
-        Analyze a single email using AI when available, rules as fallback
+        Rule-based analysis of many emails at once (no AI)
+        With numba installed, keyword hits for the whole batch are reduced
+        to categories and urgency scores in one compiled kernel
+        """
+        batch_ts = batch_ts or datetime.now()
+        texts = [self._rule_text(email) for email in emails]
+        subjects = [email.get('subject', '').lower() for email in emails]
+        
+        if _NUMBA and emails:
+            categories, urgency_scores = self._score_batch(texts, subjects)
+        else:
+            categories = [self._categorize_email(text) for text in texts]
+            urgency_scores = [self._calculate_urgency(text, subject)
+                              for text, subject in zip(texts, subjects)]
+        
+        return [
+            {**email, **self._rule_based_analysis(email, text, category, urgency, batch_ts)}
+            for email, text, category, urgency in zip(emails, texts, categories, urgency_scores)
+        ]
+    
+    def _score_batch(self, texts: List[str], subjects: List[str]):
+        """
+        Flatten keyword hits for every text into arrays and aggregate them
+        with the numba kernel; returns (categories, urgency scores)
+        """
+        category_names = list(self.categories)
+        category_index = {category: i for i, category in enumerate(category_names)}
+        
+        doc_offsets = [0]
+        cat_ids, counts, weights, bonuses = [], [], [], []
+        
+        for text, subject in zip(texts, subjects):
+            for category, score in self._category_scores(text).items():
+                if score:
+                    cat_ids.append(category_index[category])
+                    counts.append(score)
+                    weights.append(0.0)
+            
+            for phrase in self._urgency_phrases(text):
+                cat_ids.append(-1)
+                counts.append(0)
+                weights.append(self._urgency_weights[phrase])
+            
+            doc_offsets.append(len(cat_ids))
+            bonuses.append(self._urgency_bonus(text, subject))
+        
+        best, urgency = _aggregate_scores(
+            np.asarray(doc_offsets, dtype=np.int64),
+            np.asarray(cat_ids, dtype=np.int64),
+            np.asarray(counts, dtype=np.int64),
+            np.asarray(weights, dtype=np.float64),
+            np.asarray(bonuses, dtype=np.float64),
+            len(category_names),
+            category_index['Administrative']  # Default category
+        )
+        
+        return [category_names[i] for i in best], [float(u) for u in urgency]
+    
+    @staticmethod
+    def _rule_text(email: Dict) -> str:
+        """
+        Lowercased subject + body + snippet used by the rule-based analysis
+        """
+        return f"{email.get('subject', '')} {email.get('body_text', '')} {email.get('snippet', '')}".lower()
+    
+    def _rule_based_analysis(self, email: Dict, full_text: str, category: str,
+                             urgency_score: float, analysis_ts: datetime) -> Dict:
+        """
+        Assemble the rule-based analysis from an already computed category and urgency
+        """
+        return {
+            'category': category,
+            'urgency_score': urgency_score,
+            'student_association': self._identify_student(full_text),
+            'key_information': self._extract_key_info(full_text, email),
+            'summary': self._generate_summary(email, category),
+            'analysis_timestamp': analysis_ts,
+            'requires_action': urgency_score > 7.0,
+            'privacy_encoded': True,
+            'processing_method': 'Rules'
+        }
+    
+    def _analyze_chunk(self, chunk: List[Dict], batch_ts: datetime) -> List[Dict]:
+        """
+        Analyze one chunk of emails with a single Claude request,
+        falling back to per-email analysis if the batch response is unusable
         """
+        if self.ai_client:
+            try:
+                ai_results = self.analyze_with_ai_batch(chunk)
+                return [self._with_ai_metadata(email, result, batch_ts)
+                        for email, result in zip(chunk, ai_results)]
+            except Exception as e:
+                print(f"   ⚠️ Batch AI analysis failed: {str(e)}, analyzing individually")
         
-        # Initialize AI if not already done
-        if not hasattr(self, 'ai_client') or not self.ai_client:
-            self.setup_ai_client()
+        return [self.analyze_single_email(email, batch_ts) for email in chunk]
+    
+    def _with_ai_metadata(self, email: Dict, ai_result: Dict, analysis_ts: datetime) -> Dict:
+        """
+        Attach Sally's processing metadata to an AI analysis result
+        """
+        return {
+            **ai_result,
+            'timestamp': email.get('timestamp'),
+            'sender': email.get('sender', ''),
+            'analysis_timestamp': analysis_ts,
+            'privacy_encoded': True,
+            'processing_method': 'AI'
+        }
+    
+    def analyze_single_email(self, email: Dict, batch_ts: Optional[datetime] = None) -> Dict:
+        """
+        Analyze a single email using AI when available, rules as fallback
+        batch_ts lets a batch stamp all its emails with one analysis time
+        """
+        analysis_ts = batch_ts or datetime.now()
         
         # Get email content for analysis
         subject = email.get('subject', '')
-        body_text = email.get('body_text', '')
-        snippet = email.get('snippet', '')
         
         # Try AI analysis first, fallback to rules if needed
-        if hasattr(self, 'ai_client') and self.ai_client:
+        if self.ai_client:
             try:
                 # Use AI for intelligent analysis
-                ai_result = self.analyze_with_ai(f"{body_text} {snippet}", subject)
+                ai_result = self.analyze_with_ai(self._email_text(email), subject)
                 
                 # Add additional metadata
-                return {
-                    **ai_result,
-                    'timestamp': email.get('timestamp'),
-                    'sender': email.get('sender', ''),
-                    'analysis_timestamp': datetime.now(),
-                    'privacy_encoded': True,
-                    'processing_method': 'AI'
-                }
+                return self._with_ai_metadata(email, ai_result, analysis_ts)
             except Exception as e:
                 print(f"   ⚠️ AI analysis failed: {str(e)}, using fallback")
         
-        # Fallback: Rule-based analysis
-        full_text = f"{subject} {body_text} {snippet}".lower()
+        # Fallback: Rule-based analysis (category and urgency computed once, then reused)
+        full_text = self._rule_text(email)
+        category = self._categorize_email(full_text)
+        urgency_score = self._calculate_urgency(full_text, subject.lower())
         
-        return {
-            'category': self._categorize_email(full_text),
-            'urgency_score': self._calculate_urgency(full_text, subject.lower()),
-            'student_association': self._identify_student(full_text),
-            'key_information': self._extract_key_info(full_text, email),
-            'summary': self._generate_summary(email, self._categorize_email(full_text)),
-            'analysis_timestamp': datetime.now(),
-            'requires_action': self._calculate_urgency(full_text, subject.lower()) > 7.0,
-            'privacy_encoded': True,
-            'processing_method': 'Rules'
-        }
+        return self._rule_based_analysis(email, full_text, category, urgency_score, analysis_ts)
     
-    def _categorize_email(self, text: str) -> str:
+    def _build_category_matcher(self):
         """
-        Categorize email based on content keywords
-        Returns the most likely category
+        Build an Aho-Corasick automaton over all category keywords
+        Returns None when pyahocorasick isn't installed
         """
+        if ahocorasick is None:
+            return None
         
-        category_scores = {}
-        
-        # Score each category based on keyword matches
-        for category, keywords in self.categories.items():
-            score = 0
+        keyword_categories = {}
+        for category, keywords in self._categories_lc.items():
             for keyword in keywords:
-                # Count keyword occurrences (case insensitive)
-                score += text.count(keyword.lower())
+                keyword_categories.setdefault(keyword, []).append(category)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, categories in keyword_categories.items():
+            automaton.add_word(keyword, tuple(categories))
+        automaton.make_automaton()
+        return automaton
+    
+    def _category_scores(self, text: str) -> Dict[str, int]:
+        """
+        Count category keyword occurrences in the (lowercased) text
+        """
+        if self._category_matcher is not None:
+            # One pass over the text finds every keyword occurrence
+            category_scores = dict.fromkeys(self.categories, 0)
+            for _, categories in self._category_matcher.iter(text):
+                for category in categories:
+                    category_scores[category] += 1
+        else:
+            category_scores = {}
             
-            category_scores[category] = score
+            # Score each category based on keyword matches
+            # (keywords are lowercased once in __init__)
+            for category, keywords in self._categories_lc.items():
+                score = 0
+                for keyword in keywords:
+                    score += text.count(keyword)
+                
+                category_scores[category] = score
+        
+        return category_scores
+    
+    def _categorize_email(self, text: str) -> str:
+        """
+        Categorize email based on content keywords
+        Returns the most likely category
+        """
+        category_scores = self._category_scores(text)
         
         # Return category with highest score
         if category_scores and max(category_scores.values()) > 0:
@@ -288,84 +726,100 @@ This analysis will help parents stay informed and engaged in their children's ed
         else:
             return 'Administrative'  # Default category
     
+    def _build_urgency_matcher(self):
+        """
+        Combine all urgency phrases into one regex
+        A phrase listed under several weights earns each of them
+        """
+        weights = {}
+        for points, phrases in self.urgency_indicators.items():
+            for phrase in phrases:
+                weights[phrase] = weights.get(phrase, 0.0) + points
+        
+        # Zero-width lookahead so overlapping phrases ("due today" and "today")
+        # are all reported from a single scan
+        alternation = '|'.join(re.escape(p) for p in sorted(weights, key=len, reverse=True))
+        return weights, re.compile(f'(?=({alternation}))')
+    
     def _calculate_urgency(self, text: str, subject: str) -> float:
         """
         Calculate urgency score from 0-10 based on content
         Higher scores indicate more urgent communications
         """
-        urgency_score = 0.0
-        
-        # High urgency indicators
-        high_urgency_words = [
-            'urgent', 'immediate', 'asap', 'emergency', 'important',
-            'deadline', 'due today', 'due tomorrow', 'overdue',
-            'suspended', 'incident', 'injury', 'medical', 'principal office'
-        ]
-        
-        # Medium urgency indicators
-        medium_urgency_words = [
-            'payment due', 'meeting required', 'response needed',
-            'please respond', 'action required', 'sign up',
-            'permission slip', 'field trip'
-        ]
-        
-        # Time-sensitive indicators
-        time_indicators = [
-            'today', 'tomorrow', 'this week', 'deadline',
-            'expires', 'closes', 'ends'
-        ]
+        urgency_score = sum(self._urgency_weights[phrase] for phrase in self._urgency_phrases(text))
+        urgency_score += self._urgency_bonus(text, subject)
         
-        # Check for high urgency (8-10 points)
-        for word in high_urgency_words:
-            if word in text:
-                urgency_score += 3.0
-        
-        # Check for medium urgency (4-6 points)  
-        for word in medium_urgency_words:
-            if word in text:
-                urgency_score += 2.0
-        
-        # Check for time sensitivity (2-3 points)
-        for word in time_indicators:
-            if word in text:
-                urgency_score += 1.5
+        # Cap at 10.0
+        return min(urgency_score, 10.0)
+    
+    def _urgency_phrases(self, text: str) -> set:
+        """
+        Urgency phrases present in the (lowercased) text; each counts once
+        """
+        return {match.group(1) for match in self._urgency_re.finditer(text)}
+    
+    def _urgency_bonus(self, text: str, subject: str) -> float:
+        """
+        Urgency points from formatting rather than wording
+        """
+        bonus = 0.0
         
         # Subject line emphasis (all caps = more urgent)
         if subject.isupper() and len(subject) > 5:
-            urgency_score += 2.0
+            bonus += 2.0
         
         # Exclamation marks indicate urgency
-        urgency_score += min(text.count('!'), 3) * 0.5
+        bonus += min(text.count('!'), 3) * 0.5
         
-        # Cap at 10.0
-        return min(urgency_score, 10.0)
+        return bonus
+    
+    def _build_student_matcher(self, students):
+        """
+        Compile one regex over every student's real name and grade
+        Returns (pattern, matched token -> coded names); pattern is None with no students
+        """
+        token_codes = {}
+        for real_name, info in students.items():
+            coded_name = info['coded_name']
+            
+            # Real names (converted to coded names) and grade-level mentions
+            for token in (real_name.lower(), info.get('grade', '').lower()):
+                if token:
+                    token_codes.setdefault(token, []).append(coded_name)
+        
+        if not token_codes:
+            return None, token_codes
+        
+        alternation = '|'.join(re.escape(token) for token in sorted(token_codes, key=len, reverse=True))
+        return re.compile(rf'\b({alternation})\b'), token_codes
     
     def _identify_student(self, text: str) -> str:
         """
         Identify which student(s) this email relates to
         Uses privacy-safe coded names
         """
-        
-        # Check for student name mentions (using coded names for privacy)
-        student_mentions = []
-        
-        for real_name, info in self.config.students.items():
-            coded_name = info['coded_name']
-            
-            # Look for real name in email (convert to coded name)
-            if real_name.lower() in text:
-                student_mentions.append(coded_name)
-            
-            # Also check for grade-level mentions
-            grade = info.get('grade', '').lower()
-            if grade in text:
-                student_mentions.append(coded_name)
-        
-        if student_mentions:
-            # Remove duplicates and return
-            return ', '.join(list(set(student_mentions)))
-        else:
-            return 'All Students'  # General school communication
+        # Nothing to scan (callers join empty fields with spaces)
+        if not text or text.isspace():
+            return 'All Students'
+        
+        # The config hands out a new students view whenever students change
+        students = self.config.students
+        if self._student_matcher_for is not students:
+            self._student_matcher = self._build_student_matcher(students)
+            self._student_matcher_for = students
+        pattern, token_codes = self._student_matcher
+        
+        if pattern is None:
+            return 'All Students'
+        
+        # One scan for all students; dict keys dedupe while keeping mention order
+        student_mentions = dict.fromkeys(
+            coded_name
+            for match in pattern.finditer(text)
+            for coded_name in token_codes[match.group(1)]
+        )
+        
+        return ', '.join(student_mentions) or 'All Students'  # General school communication
     
     def _extract_key_info(self, text: str, email: Dict) -> Dict:
         """
@@ -381,41 +835,27 @@ This analysis will help parents stay informed and engaged in their children's ed
             'contacts': []
         }
         
-        # Extract dates (simple patterns)
-        date_patterns = [
-            r'\b\d{1,2}/\d{1,2}/\d{4}\b',  # MM/DD/YYYY
-            r'\b\d{1,2}-\d{1,2}-\d{4}\b',  # MM-DD-YYYY
-            r'\b[A-Za-z]+ \d{1,2},? \d{4}\b'  # Month DD, YYYY
-        ]
+        # Nothing to scan (callers join empty fields with spaces)
+        if not text or text.isspace():
+            return key_info
         
-        for pattern in date_patterns:
-            dates = re.findall(pattern, text)
-            key_info['dates'].extend(dates)
+        # Extract dates (all formats in a single scan)
+        key_info['dates'] = _DATE_RE.findall(text)
         
         # Extract dollar amounts
-        amount_pattern = r'\$\d+\.?\d*'
-        amounts = re.findall(amount_pattern, text)
-        key_info['amounts'] = amounts
+        key_info['amounts'] = _AMOUNT_RE.findall(text)
         
         # Extract phone numbers
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        phones = re.findall(phone_pattern, text)
-        key_info['contacts'] = phones
-        
-        # Extract action items (sentences with action words)
-        action_words = ['please', 'must', 'need to', 'required to', 'should']
-        sentences = text.split('.')
+        key_info['contacts'] = _PHONE_RE.findall(text)
         
-        for sentence in sentences:
-            for action_word in action_words:
-                if action_word in sentence.lower():
-                    key_info['action_items'].append(sentence.strip())
-                    break
+        # Extract action items (sentences with action words), stopping after 3
+        key_info['action_items'] = [
+            match.group(1).strip() for match in islice(_ACTION_RE.finditer(text), 3)
+        ]
         
         # Clean up data
         key_info['dates'] = list(set(key_info['dates']))[:5]  # Limit to 5 dates
         key_info['amounts'] = list(set(key_info['amounts']))[:3]  # Limit to 3 amounts
-        key_info['action_items'] = key_info['action_items'][:3]  # Limit to 3 actions
         
         return key_info
     
@@ -451,20 +891,8 @@ This analysis will help parents stay informed and engaged in their children's ed
         
         # Add educational context to snippet
         if snippet and len(snippet) > 20:
-            # Clean snippet of potentially harsh language
-            educational_snippet = snippet
-            
-            # Replace potentially concerning terms with supportive alternatives
-            replacements = {
-                'failing': 'needs support',
-                'poor behavior': 'behavioral growth opportunity',
-                'discipline': 'guidance',
-                'problem': 'area for development',
-                'concerning': 'worth discussing'
-            }
-            
-            for harsh_term, supportive_term in replacements.items():
-                educational_snippet = educational_snippet.replace(harsh_term, supportive_term)
+            # Clean snippet of potentially harsh language, replacing all terms in one pass
+            educational_snippet = _SUPPORTIVE_RE.sub(lambda match: _SUPPORTIVE[match.group(0)], snippet)
             
             # Add snippet preview (first 100 characters)
             preview = educational_snippet[:100] + "..." if len(educational_snippet) > 100 else educational_snippet
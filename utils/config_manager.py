@@ -10,7 +10,18 @@ EDUCATIONAL CONCEPTS:
 """
 
 import os
+import mmap
+import hashlib
+from functools import cached_property
 from pathlib import Path
+from types import MappingProxyType
+
+# Linux (Python 3.10+): MAP_POPULATE reads the whole file in when it's mapped,
+# instead of faulting pages in one by one during parsing. Elsewhere use a plain read-only map
+if hasattr(mmap, 'MAP_POPULATE'):
+    _MMAP_READ_ARGS = {'flags': mmap.MAP_PRIVATE | mmap.MAP_POPULATE, 'prot': mmap.PROT_READ}
+else:
+    _MMAP_READ_ARGS = {'access': mmap.ACCESS_READ}
 
 class ConfigManager:
     """
@@ -22,36 +33,116 @@ class ConfigManager:
         self.config_dir = Path(config_dir)
         
         # Configuration storage - these will hold your settings
-        self.schools = []           # List of school domains to monitor
-        self.students = {}          # Student name → coded name mapping
-        self.recipients = {}        # Email addresses for alerts/summaries
-        self.urgent_keywords = []   # Words that indicate urgent emails
+        # schools, students and recipients are read from their files on first use
+        # (or when load_all_configs / load_* is called) - see the properties below
+        self._clear_students()
+        self._students_loaded = False
+        
+        # Lookup tables derived from students
+        self._coded_to_real = {}    # Coded name → real name
+        self._fallback_codes = {}   # Unknown name → stable code
         
         print(f"🔧 ConfigManager initialized, reading from: {self.config_dir}")
     
+    @cached_property
+    def schools(self):
+        """
+        List of school domains to monitor - schools.txt is read on first use
+        """
+        self.load_schools()
+        return self.schools
+    
+    @cached_property
+    def recipients(self):
+        """
+        Email addresses for alerts/summaries - recipients.txt is read on first use
+        """
+        self.load_recipients()
+        return self.recipients
+    
+    @property
+    def students(self):
+        """
+        Student name → {'coded_name', 'grade'} mapping - students.txt is read on first use
+        Students are stored as parallel lists (one per field); this is a read-only
+        view of them, rebuilt by _index_students - assign a new mapping to change students
+        """
+        self._ensure_students()
+        return self._students_view
+    
+    @students.setter
+    def students(self, mapping):
+        self._clear_students()
+        self._students_loaded = True
+        for real_name, info in mapping.items():
+            self._add_student(real_name, info['coded_name'], info['grade'])
+        self._index_students()
+    
+    def _ensure_students(self):
+        """
+        Read students.txt the first time student data is needed
+        """
+        if not self._students_loaded:
+            self.load_students()
+    
+    def _clear_students(self):
+        """
+        Empty the student columns
+        """
+        self._real_names = []       # Column of real names
+        self._coded_names = []      # Column of coded names (same order)
+        self._grades = []           # Column of grades (same order)
+        self._name_to_idx = {}      # Real name → row in the columns
+        self._students_view = MappingProxyType({})  # Read-only dict view (see students)
+    
+    def _add_student(self, real_name, coded_name, grade):
+        """
+        Add a student row (or replace the row of a student already listed)
+        """
+        idx = self._name_to_idx.get(real_name)
+        if idx is None:
+            self._name_to_idx[real_name] = len(self._real_names)
+            self._real_names.append(real_name)
+            self._coded_names.append(coded_name)
+            self._grades.append(grade)
+        else:
+            self._coded_names[idx] = coded_name
+            self._grades[idx] = grade
+    
+    def _read_config_lines(self, path):
+        """
+        Read a config file and return its meaningful lines
+        Blank lines and comments (lines starting with #) are dropped, the rest are stripped
+        The file is memory-mapped and split in one go rather than read line by line
+        """
+        with open(path, 'rb') as f:
+            # mmap can't map an empty file
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, **_MMAP_READ_ARGS) as mm:
+                text = mm[:].decode('utf-8')
+        
+        lines = (line.strip() for line in text.splitlines())
+        return [line for line in lines if line and not line.startswith('#')]
+    
     def load_schools(self):
         """
         Load school domains from schools.txt
         These are the email domains Sally will monitor
         """
         schools_file = self.config_dir / "schools.txt"
+        self.schools = []
         
         if not schools_file.exists():
             print("❌ schools.txt not found! Please create it in the config folder.")
             return False
         
-        self.schools = []
         print(f"📚 Reading school domains from {schools_file}")
         
         try:
-            with open(schools_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Skip empty lines and comments (lines starting with #)
-                    if line and not line.startswith('#'):
-                        self.schools.append(line.lower())
-                        print(f"   ✅ Added school domain: {line}")
+            for line in self._read_config_lines(schools_file):
+                self.schools.append(line.lower())
+                print(f"   ✅ Added school domain: {line}")
             
             if self.schools:
                 print(f"🎯 Successfully loaded {len(self.schools)} school domains")
@@ -70,40 +161,34 @@ class ConfigManager:
         Format: RealName|CodedName|Grade
         """
         students_file = self.config_dir / "students.txt"
+        self._clear_students()
+        self._students_loaded = True
+        self._index_students()
         
         if not students_file.exists():
             print("❌ students.txt not found! Please create it in the config folder.")
             return False
         
-        self.students = {}
         print(f"👨‍👩‍👧‍👦 Reading student information from {students_file}")
         
         try:
-            with open(students_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
+            for line in self._read_config_lines(students_file):
+                # Parse format: RealName|CodedName|Grade
+                parts = line.split('|')
+                
+                if len(parts) >= 2:
+                    real_name = parts[0].strip()
+                    coded_name = parts[1].strip()
+                    grade = parts[2].strip() if len(parts) > 2 else "Unknown Grade"
+                    
+                    self._add_student(real_name, coded_name, grade)
                     
-                    # Skip empty lines and comments
-                    if line and not line.startswith('#'):
-                        # Parse format: RealName|CodedName|Grade
-                        parts = line.split('|')
-                        
-                        if len(parts) >= 2:
-                            real_name = parts[0].strip()
-                            coded_name = parts[1].strip()
-                            grade = parts[2].strip() if len(parts) > 2 else "Unknown Grade"
-                            
-                            self.students[real_name] = {
-                                'coded_name': coded_name,
-                                'grade': grade
-                            }
-                            
-                            print(f"   ✅ {real_name} → {coded_name} ({grade})")
-                        else:
-                            print(f"   ⚠️ Line {line_num} malformed: {line}")
+                    print(f"   ✅ {real_name} → {coded_name} ({grade})")
+                else:
+                    print(f"   ⚠️ Malformed line: {line}")
             
-            if self.students:
-                print(f"🎯 Successfully loaded {len(self.students)} students")
+            if self._real_names:
+                print(f"🎯 Successfully loaded {len(self._real_names)} students")
                 return True
             else:
                 print("⚠️ No students found in students.txt")
@@ -112,6 +197,21 @@ class ConfigManager:
         except Exception as e:
             print(f"❌ Error reading students.txt: {str(e)}")
             return False
+        
+        finally:
+            # Keep lookup tables in step with whatever was loaded (even on a partial read)
+            self._index_students()
+    
+    def _index_students(self):
+        """
+        Rebuild lookup tables derived from self.students
+        Call this whenever self.students changes
+        """
+        self._coded_to_real = dict(zip(self._coded_names, self._real_names))
+        self._students_view = MappingProxyType({
+            real_name: MappingProxyType({'coded_name': coded_name, 'grade': grade})
+            for real_name, coded_name, grade in zip(self._real_names, self._coded_names, self._grades)
+        })
 
     def load_all_configs(self):
         """
@@ -135,46 +235,48 @@ class ConfigManager:
         Convert real student name to privacy-safe coded name
         This protects your children's privacy when using AI services
         """
-        if real_name in self.students:
-            return self.students[real_name]['coded_name']
+        self._ensure_students()
+        idx = self._name_to_idx.get(real_name)
+        if idx is not None:
+            return self._coded_names[idx]
         else:
             # Create a generic coded name if not found
-            return f"Student_Unknown_{abs(hash(real_name)) % 1000}"
+            # blake2b gives the same code on every run (Python's hash() is randomized per process)
+            code = self._fallback_codes.get(real_name)
+            if code is None:
+                code = hashlib.blake2b(real_name.encode('utf-8'), digest_size=3).hexdigest()
+                self._fallback_codes[real_name] = code
+            return f"Student_Unknown_{code}"
     
     def get_real_name(self, coded_name):
         """
         Convert coded name back to real name for family display
         """
-        for real_name, info in self.students.items():
-            if info['coded_name'] == coded_name:
-                return real_name
-        return coded_name  # Return as-is if not found
+        self._ensure_students()
+        return self._coded_to_real.get(coded_name, coded_name)  # Return as-is if not found
 
     def load_recipients(self):
         """Load email recipient configuration"""  
         recipients_file = self.config_dir / "recipients.txt"
+        self.recipients = {'summary': [], 'urgent': []}
         
         if not recipients_file.exists():
             print("recipients.txt not found. Please configure email recipients.")
             return False
         
-        self.recipients = {'summary': [], 'urgent': []}
-        with open(recipients_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    # Format: EmailType|EmailAddress|Name
-                    parts = line.split('|')
-                    if len(parts) >= 2:
-                        email_type = parts[0].strip().lower()
-                        email_address = parts[1].strip()
-                        name = parts[2].strip() if len(parts) > 2 else "User"
-                        
-                        if email_type in self.recipients:
-                            self.recipients[email_type].append({
-                                'email': email_address,
-                                'name': name
-                            })
+        for line in self._read_config_lines(recipients_file):
+            # Format: EmailType|EmailAddress|Name
+            parts = line.split('|')
+            if len(parts) >= 2:
+                email_type = parts[0].strip().lower()
+                email_address = parts[1].strip()
+                name = parts[2].strip() if len(parts) > 2 else "User"
+                
+                if email_type in self.recipients:
+                    self.recipients[email_type].append({
+                        'email': email_address,
+                        'name': name
+                    })
         
         print(f"Loaded email recipients: {len(self.recipients['summary'])} summary, {len(self.recipients['urgent'])} urgent")
         return True
@@ -193,9 +295,9 @@ class ConfigManager:
         student_success = self.load_students()
         
         # Show privacy mapping test
-        if student_success and self.students:
+        if student_success and self._real_names:
             print("\n🔒 Privacy Protection Test:")
-            for real_name in self.students.keys():
+            for real_name in self._real_names:
                 coded = self.get_coded_name(real_name)
                 back_to_real = self.get_real_name(coded)
                 print(f"   {real_name} → {coded} → {back_to_real}")
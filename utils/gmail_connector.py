@@ -10,28 +10,87 @@ EDUCATIONAL CONCEPTS:
 """
 
 import os
-import pickle
 import json
+import logging
+import base64
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from datetime import datetime, timedelta
+from email.utils import parseaddr
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
 
 # Gmail API imports
+import httplib2
+import google_auth_httplib2
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# Optional: keyring keeps the OAuth token in the OS credential store instead of token.json
+try:
+    import keyring
+    from keyring.errors import KeyringError
+except ImportError:
+    keyring = None
+
+logger = logging.getLogger("Sally.Gmail")
+
+# Bound once so the body-decoding loop skips the base64 attribute lookup
+_b64decode = base64.urlsafe_b64decode
+_b64encode = base64.urlsafe_b64encode
+
+# Where the OAuth token lives in the OS keyring
+KEYRING_SERVICE = "sally3"
+KEYRING_USERNAME = "gmail_token"
+
+# Requests per Gmail batch call (Gmail allows 100 but advises 50 to avoid rate limiting)
+GMAIL_BATCH_SIZE = 50
+
+# Partial response: only the message fields _parse_message reads (no attachment payloads)
+MESSAGE_FIELDS = (
+    'id,threadId,internalDate,snippet,labelIds,'
+    'payload(headers,mimeType,body/data,'
+    'parts(mimeType,body/data,parts(mimeType,body/data,parts(mimeType,body/data))))'
+)
+
+# Headers (and fields) requested by the lightweight metadata pass
+METADATA_HEADERS = ['From', 'Subject', 'To', 'Date']
+METADATA_FIELDS = 'id,threadId,internalDate,snippet,labelIds,payload/headers'
+
+# Socket timeout (seconds) for the shared Gmail HTTP connection
+HTTP_TIMEOUT = 30
+
+# Most message ids Gmail returns per messages().list() page
+GMAIL_LIST_PAGE_SIZE = 500
+
+# Gmail label Sally puts on school emails, and the most ids one batchModify call accepts
+SCHOOL_LABEL_NAME = "Sally-School"
+GMAIL_MODIFY_BATCH_SIZE = 1000
+
+# Parsed emails saved on disk by message id (a sent email's content never changes)
+EMAIL_CACHE_DIR = Path("output/cache/gmail")
+
 class GmailConnector:
     """
     Handles all Gmail API operations for Sally 3.0
     Reuses your existing Gmail API credentials from Sally 1.0
     """
     
+    # Built once per process and shared by every connector instance
+    _shared_service = None
+    _shared_credentials = None
+    
     def __init__(self, config_manager):
         self.config = config_manager
         self.service = None
         self.credentials = None
+        self._school_label_id = None   # Looked up (or created) on first use
         
         # Gmail API scopes - what permissions Sally needs
         self.SCOPES = [
@@ -48,16 +107,22 @@ class GmailConnector:
         """
         print(f"🔐 Authenticating with Gmail API...")
         
+        # Reuse the service another instance already built
+        if GmailConnector._shared_service is not None:
+            self.service = GmailConnector._shared_service
+            self.credentials = GmailConnector._shared_credentials
+            print("✅ Gmail API authentication successful! (reusing connection)")
+            return True
+        
         # Check if we have stored credentials
         token_path = Path("token.json")
         
         try:
             # Try to load existing token
-            if token_path.exists():
+            token_info = self._load_token(token_path)
+            if token_info:
                 print("   📱 Found existing token, loading...")
-                self.credentials = Credentials.from_authorized_user_file(
-                    token_path, self.SCOPES
-                )
+                self.credentials = Credentials.from_authorized_user_info(token_info, self.SCOPES)
             
             # If there are no (valid) credentials available, let the user log in
             if not self.credentials or not self.credentials.valid:
@@ -105,19 +170,95 @@ class GmailConnector:
                 
                 # Save the credentials for the next run
                 if self.credentials:
-                    with open(token_path, 'w') as token:
-                        token.write(self.credentials.to_json())
-                    print("   💾 Credentials saved for future use")
+                    self._save_token(token_path)
             
-            # Build the Gmail service
-            self.service = build('gmail', 'v1', credentials=self.credentials)
+            # Build the Gmail service over one keep-alive HTTP connection
+            # static_discovery uses the discovery document bundled with the client library
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT)
+            )
+            self.service = build('gmail', 'v1', http=http,
+                                 static_discovery=True, cache_discovery=False)
+            GmailConnector._shared_service = self.service
+            GmailConnector._shared_credentials = self.credentials
             print("✅ Gmail API authentication successful!")
             return True
         
-    except Exception as e:
-        print(f"❌ Gmail authentication failed: {str(e)}")
-        return False
+        except RefreshError as e:
+            # Saved token was revoked or expired for good - delete it and sign in again
+            logger.warning(f"Gmail token refresh failed ({e}), starting a new sign-in")
+            print("   ⚠️ Saved credentials are no longer valid, signing in again...")
+            self._delete_token(token_path)
+            self.credentials = None
+            return self.authenticate(client_secret_path)
+        
+        except FileNotFoundError as e:
+            logger.error("Gmail authentication file missing", exc_info=True)
+            print(f"❌ Gmail authentication failed: file not found: {e.filename}")
+            return False
+        
+        except HttpError as e:
+            logger.error("Gmail API error during authentication", exc_info=True)
+            print(f"❌ Gmail authentication failed: {str(e)}")
+            return False
+        
+    def _load_token(self, token_path):
+        """
+        Load the saved OAuth token (as a dict), or None if there isn't one
+        The OS keyring is checked first; an old token.json is moved into
+        the keyring the first time it's found, so the plaintext file goes away
+        """
+        if keyring is not None:
+            try:
+                token_json = keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+                if token_json:
+                    return json.loads(token_json)
+                
+                # Migration: existing users still have token.json from earlier versions
+                if token_path.exists():
+                    token_json = token_path.read_text(encoding='utf-8')
+                    keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, token_json)
+                    token_path.unlink()
+                    print("   🔑 Moved saved token from token.json to the system keyring")
+                    return json.loads(token_json)
+                
+                return None
+            except KeyringError as e:
+                logger.warning(f"System keyring unavailable ({e}), using token.json")
+        
+        if token_path.exists():
+            return json.loads(token_path.read_bytes())
+        return None
+    
+    def _save_token(self, token_path):
+        """
+        Save the OAuth token to the OS keyring (or token.json without one)
+        """
+        token_json = self.credentials.to_json()
+        
+        if keyring is not None:
+            try:
+                keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, token_json)
+                print("   💾 Credentials saved to the system keyring for future use")
+                return
+            except KeyringError as e:
+                logger.warning(f"System keyring unavailable ({e}), saving token.json")
         
+        with open(token_path, 'w') as token:
+            token.write(token_json)
+        print("   💾 Credentials saved for future use")
+    
+    def _delete_token(self, token_path):
+        """
+        Forget the saved OAuth token wherever it's stored
+        """
+        if keyring is not None:
+            try:
+                keyring.delete_password(KEYRING_SERVICE, KEYRING_USERNAME)
+            except KeyringError:
+                pass  # Nothing stored (or no keyring) - nothing to delete
+        token_path.unlink(missing_ok=True)
+    
     def test_connection(self):
         """
         Test the Gmail connection by getting basic profile info
@@ -148,9 +289,25 @@ class GmailConnector:
         Fetch emails from configured school domains
         This is where Sally finds the school communications to analyze
         """
+        school_emails = []
+        for page in self.iter_school_emails(days_back, page_size=max_results, max_results=max_results):
+            school_emails.extend(page)
+        
+        print(f"✅ Successfully retrieved {len(school_emails)} school emails")
+        return school_emails
+    
+    def iter_school_emails(self, days_back=7, page_size=50, max_results=None):
+        """
+        Yield school emails one page (up to page_size emails) at a time
+        Callers can analyze each page while the next one is fetched,
+        without holding the whole period's emails in memory
+        
+        Headers are checked first (cheap metadata requests) and full bodies
+        are only downloaded for emails that pass
+        """
         if not self.service:
             print("❌ Gmail service not initialized. Run authenticate() first.")
-            return []
+            return
         
         print(f"📬 Fetching school emails from last {days_back} days...")
         
@@ -158,97 +315,322 @@ class GmailConnector:
         school_domains = self.config.schools
         if not school_domains:
             print("⚠️ No school domains configured")
-            return []
-        
-        # Create Gmail search query: "from:domain1.edu OR from:domain2.edu"
-        domain_queries = [f"from:{domain}" for domain in school_domains]
-        search_query = " OR ".join(domain_queries)
+            return
         
         # Add date filter for recent emails
         date_filter = (datetime.now() - timedelta(days=days_back)).strftime('%Y/%m/%d')
-        search_query += f" after:{date_filter}"
+        search_query = self._build_query(tuple(school_domains), date_filter)
         
         print(f"   🔍 Search query: {search_query}")
         
+        # Matching ids stream in as needed, capped at max_results
+        message_ids = self._iter_message_ids(search_query)
+        if max_results is not None:
+            message_ids = islice(message_ids, max_results)
+        
+        fetched = 0
+        
         try:
-            # Search for emails
+            while True:
+                page_ids = list(islice(message_ids, page_size))
+                if not page_ids:
+                    break
+                fetched += len(page_ids)
+                
+                # Emails fetched on an earlier run are read from the disk cache once, for both stages
+                cached = self._load_cached_emails(page_ids)
+                
+                # Stage 1: headers only - drop emails that aren't really from a school
+                headers = self._get_email_metadata_batch(page_ids, cached)
+                wanted = [email['id'] for email in headers if self._is_school_sender(email['sender'])]
+                
+                # Stage 2: full details for the survivors, many per HTTP request
+                school_emails = self._get_email_details_batch(wanted, cached)
+                logger.debug(f"Retrieved {len(school_emails)} of {len(page_ids)} emails found on this page")
+                
+                if school_emails:
+                    yield school_emails
+            
+            if not fetched:
+                print("   📭 No school emails found")
+            
+        except HttpError as error:
+            print(f"❌ Error fetching emails: {error}")
+    
+    def _iter_message_ids(self, query):
+        """
+        Yield the id of every email matching a Gmail search query
+        Follows nextPageToken so nothing is silently dropped; each list
+        page (up to GMAIL_LIST_PAGE_SIZE ids) is requested only when needed
+        """
+        page_token = None
+        while True:
             results = self.service.users().messages().list(
                 userId='me',
-                q=search_query,
-                maxResults=max_results
+                q=query,
+                maxResults=GMAIL_LIST_PAGE_SIZE,
+                pageToken=page_token
             ).execute()
             
-            messages = results.get('messages', [])
+            yield from (message['id'] for message in results.get('messages', []))
             
-            if not messages:
-                print("   📭 No school emails found")
-                return []
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _build_query(schools, after_date=None):
+        """
+        Gmail search query matching any of the school domains (a tuple),
+        optionally only after a YYYY/MM/DD date
+        Memoized - the same schools and date always give the same string
+        """
+        # Create Gmail search query: "from:domain1.edu OR from:domain2.edu"
+        search_query = " OR ".join(f"from:{domain}" for domain in schools)
+        if after_date:
+            search_query += f" after:{after_date}"
+        return search_query
+    
+    def _get_school_label_id(self):
+        """
+        Find Sally's school label, creating it the first time
+        """
+        if self._school_label_id is None:
+            labels = self.service.users().labels().list(userId='me').execute().get('labels', [])
+            for label in labels:
+                if label['name'] == SCHOOL_LABEL_NAME:
+                    self._school_label_id = label['id']
+                    break
+            else:
+                label = self.service.users().labels().create(userId='me', body={
+                    'name': SCHOOL_LABEL_NAME,
+                    'labelListVisibility': 'labelShow',
+                    'messageListVisibility': 'show'
+                }).execute()
+                self._school_label_id = label['id']
+                print(f"   🏷️ Created Gmail label: {SCHOOL_LABEL_NAME}")
+        
+        return self._school_label_id
+    
+    def label_school_emails(self, days_back=None):
+        """
+        One-shot: put the school label on existing emails from school domains
+        Pass days_back to limit it to recent emails; by default all mail is labeled
+        Returns the number of emails labeled
+        """
+        if not self.service:
+            print("❌ Gmail service not initialized. Run authenticate() first.")
+            return 0
+        
+        if not self.config.schools:
+            print("⚠️ No school domains configured")
+            return 0
+        
+        date_filter = None
+        if days_back is not None:
+            date_filter = (datetime.now() - timedelta(days=days_back)).strftime('%Y/%m/%d')
+        search_query = self._build_query(tuple(self.config.schools), date_filter)
+        
+        try:
+            label_id = self._get_school_label_id()
             
-            print(f"   📧 Found {len(messages)} school emails")
+            message_ids = list(self._iter_message_ids(search_query))
             
-            # Get full email details
-            school_emails = []
-            for i, message in enumerate(messages, 1):
-                print(f"   📄 Processing email {i}/{len(messages)}...", end='')
-                
-                email_data = self._get_email_details(message['id'])
-                if email_data:
-                    school_emails.append(email_data)
-                    print(" ✅")
-                else:
-                    print(" ❌")
+            # One batchModify call labels up to 1000 emails
+            for start in range(0, len(message_ids), GMAIL_MODIFY_BATCH_SIZE):
+                self.service.users().messages().batchModify(userId='me', body={
+                    'ids': message_ids[start:start + GMAIL_MODIFY_BATCH_SIZE],
+                    'addLabelIds': [label_id]
+                }).execute()
             
-            print(f"✅ Successfully retrieved {len(school_emails)} school emails")
-            return school_emails
+            print(f"🏷️ Labeled {len(message_ids)} school emails as {SCHOOL_LABEL_NAME}")
+            return len(message_ids)
             
         except HttpError as error:
-            print(f"❌ Error fetching emails: {error}")
-            return []
+            print(f"❌ Error labeling school emails: {error}")
+            return 0
     
     def _get_email_details(self, message_id):
         """
         Get full details of a specific email
         Extracts subject, sender, body, attachments, etc.
         """
+        cached = self._load_cached_email(message_id)
+        if cached:
+            return cached
+        
         try:
             # Get the email
             message = self.service.users().messages().get(
                 userId='me', 
                 id=message_id,
-                format='full'  # Get full email content
+                format='full',  # Get full email content
+                fields=MESSAGE_FIELDS
             ).execute()
             
-            # Extract email headers
-            payload = message['payload']
-            headers = payload.get('headers', [])
-            
-            # Parse headers into dictionary
-            header_dict = {header['name'].lower(): header['value'] for header in headers}
-            
-            # Extract email body
-            body = self._extract_email_body(payload)
-            
-            # Create standardized email data structure
-            email_data = {
-                'id': message_id,
-                'thread_id': message.get('threadId'),
-                'timestamp': datetime.fromtimestamp(int(message['internalDate']) / 1000),
-                'sender': header_dict.get('from', 'Unknown'),
-                'subject': header_dict.get('subject', 'No Subject'),
-                'to': header_dict.get('to', ''),
-                'body_text': body.get('text', ''),
-                'body_html': body.get('html', ''),
-                'snippet': message.get('snippet', ''),  # Gmail's auto-preview
-                'labels': message.get('labelIds', []),
-                'attachments': []  # TODO: Handle attachments in next version
-            }
-            
+            email_data = self._parse_message(message)
+            self._store_cached_email(email_data)
             return email_data
             
         except HttpError as error:
-            print(f"Error getting email details: {error}")
+            logger.warning(f"Error getting email details for {message_id}: {error}")
             return None
     
+    def _get_email_metadata_batch(self, message_ids, cached=None):
+        """
+        Get headers and snippets of many emails using Gmail batch requests
+        Emails already in the disk cache are answered from it (a full email has every header field)
+        cached: {message_id: email} already read by _load_cached_emails, if the caller has it
+        Returns emails in message_ids order, skipping failures
+        """
+        found = dict(cached) if cached is not None else self._load_cached_emails(message_ids)
+        missing = [message_id for message_id in message_ids if message_id not in found]
+        
+        found.update(self._batch_get(missing, self._parse_metadata,
+                                     format='metadata', metadataHeaders=METADATA_HEADERS,
+                                     fields=METADATA_FIELDS))
+        
+        return [found[message_id] for message_id in message_ids if message_id in found]
+    
+    def _get_email_details_batch(self, message_ids, cached=None):
+        """
+        Get full details of many emails using Gmail batch requests
+        Returns parsed emails in message_ids order, skipping failures
+        Emails already in the disk cache are not fetched again
+        cached: {message_id: email} already read by _load_cached_emails, if the caller has it
+        """
+        parsed = dict(cached) if cached is not None else self._load_cached_emails(message_ids)
+        missing = [message_id for message_id in message_ids if message_id not in parsed]
+        
+        fetched = self._batch_get(missing, self._parse_message, format='full', fields=MESSAGE_FIELDS)
+        for email_data in fetched.values():
+            self._store_cached_email(email_data)
+        parsed.update(fetched)
+        
+        return [parsed[message_id] for message_id in message_ids if message_id in parsed]
+    
+    def _batch_get(self, message_ids, parse, **get_args):
+        """
+        Run messages().get(**get_args) for every id through Gmail batch requests
+        Up to GMAIL_BATCH_SIZE messages travel in one HTTP round trip
+        Returns {message_id: parse(response)}, leaving out failed messages
+        """
+        parsed = {}
+        
+        def on_message(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"Error getting email {request_id}: {exception}")
+            else:
+                parsed[request_id] = parse(response)
+        
+        for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_message)
+            for message_id in message_ids[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(
+                    self.service.users().messages().get(userId='me', id=message_id, **get_args),
+                    request_id=message_id
+                )
+            batch.execute()
+        
+        return parsed
+    
+    def _load_cached_email(self, message_id):
+        """
+        Return a previously fetched email from the disk cache, or None
+        """
+        cache_path = EMAIL_CACHE_DIR / f"{message_id}.json"
+        try:
+            email_data = json.loads(cache_path.read_bytes())
+            email_data['timestamp'] = datetime.fromisoformat(email_data['timestamp'])
+            return email_data
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # Not cached yet (or unreadable) - fetch from Gmail
+    
+    def _load_cached_emails(self, message_ids):
+        """
+        Return {message_id: email} for the emails found in the disk cache
+        """
+        found = {}
+        for message_id in message_ids:
+            cached = self._load_cached_email(message_id)
+            if cached:
+                found[message_id] = cached
+        return found
+    
+    def _store_cached_email(self, email_data):
+        """
+        Save a parsed email to the disk cache
+        Caching is best-effort - a failed write just means fetching again next run
+        """
+        try:
+            EMAIL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_path = EMAIL_CACHE_DIR / f"{email_data['id']}.json"
+            cache_path.write_text(
+                json.dumps({**email_data, 'timestamp': email_data['timestamp'].isoformat()}),
+                encoding='utf-8'
+            )
+        except OSError as e:
+            logger.warning(f"Could not cache email {email_data['id']}: {str(e)}")
+    
+    def _parse_metadata(self, message):
+        """
+        Convert a format='metadata' Gmail message into Sally's email structure (without bodies)
+        """
+        header_dict = {header['name'].lower(): header['value']
+                       for header in message.get('payload', {}).get('headers', [])}
+        
+        return {
+            'id': message['id'],
+            'thread_id': message.get('threadId'),
+            'timestamp': datetime.fromtimestamp(int(message['internalDate']) / 1000),
+            'sender': header_dict.get('from', 'Unknown'),
+            'subject': header_dict.get('subject', 'No Subject'),
+            'to': header_dict.get('to', ''),
+            'snippet': message.get('snippet', ''),
+            'labels': message.get('labelIds', [])
+        }
+    
+    def _is_school_sender(self, sender):
+        """
+        Check the sender's address really belongs to a school domain (or a subdomain of one)
+        Gmail's from: search also matches display names and look-alike addresses
+        """
+        address = parseaddr(sender)[1].lower()
+        domain = address.rpartition('@')[2]
+        return any(domain == school or domain.endswith('.' + school) for school in self.config.schools)
+    
+    def _parse_message(self, message):
+        """
+        Convert a fetched Gmail message into Sally's email structure
+        """
+        # Extract email headers
+        payload = message['payload']
+        headers = payload.get('headers', [])
+        
+        # Parse headers into dictionary
+        header_dict = {header['name'].lower(): header['value'] for header in headers}
+        
+        # Extract email body
+        body = self._extract_email_body(payload)
+        
+        # Create standardized email data structure
+        email_data = {
+            'id': message['id'],
+            'thread_id': message.get('threadId'),
+            'timestamp': datetime.fromtimestamp(int(message['internalDate']) / 1000),
+            'sender': header_dict.get('from', 'Unknown'),
+            'subject': header_dict.get('subject', 'No Subject'),
+            'to': header_dict.get('to', ''),
+            'body_text': body.get('text', ''),
+            'body_html': body.get('html', ''),
+            'snippet': message.get('snippet', ''),  # Gmail's auto-preview
+            'labels': message.get('labelIds', []),
+            'attachments': []  # TODO: Handle attachments in next version
+        }
+        
+        return email_data
+    
     def _extract_email_body(self, payload):
         """
         Extract text and HTML body from Gmail message payload
@@ -256,38 +638,49 @@ class GmailConnector:
         """
         body_data = {'text': '', 'html': ''}
         
-        # Handle different payload structures
-        if 'parts' in payload:
-            # Multi-part email (text + HTML + attachments)
-            for part in payload['parts']:
-                mime_type = part.get('mimeType')
-                
-                if mime_type == 'text/plain':
-                    if 'data' in part['body']:
-                        import base64
-                        text_data = base64.urlsafe_b64decode(part['body']['data'])
-                        body_data['text'] = text_data.decode('utf-8')
-                
-                elif mime_type == 'text/html':
-                    if 'data' in part['body']:
-                        import base64
-                        html_data = base64.urlsafe_b64decode(part['body']['data'])
-                        body_data['html'] = html_data.decode('utf-8')
-        else:
-            # Simple email (just text or HTML)
-            if payload['body'].get('data'):
-                import base64
-                body_bytes = base64.urlsafe_b64decode(payload['body']['data'])
-                body_text = body_bytes.decode('utf-8')
-                
-                mime_type = payload.get('mimeType')
-                if mime_type == 'text/html':
-                    body_data['html'] = body_text
-                else:
-                    body_data['text'] = body_text
+        # Walk the whole MIME tree breadth-first - Gmail often nests
+        # multipart/alternative (text + HTML) inside multipart/mixed (attachments)
+        pending = deque([payload])
+        while pending and not (body_data['text'] and body_data['html']):
+            part = pending.popleft()
+            pending.extend(part.get('parts', []))
+            
+            data = part.get('body', {}).get('data')
+            if not data:
+                continue
+            
+            # A single-part email that isn't HTML counts as text
+            mime_type = part.get('mimeType')
+            if mime_type == 'text/html':
+                key = 'html'
+            elif mime_type == 'text/plain' or part is payload:
+                key = 'text'
+            else:
+                continue
+            
+            # Keep the first body of each kind
+            if not body_data[key]:
+                body_data[key] = _b64decode(data).decode('utf-8', errors='replace')
         
         return body_data
     
+    @staticmethod
+    def _build_message(to_email, subject, body_html):
+        """
+        Gmail API send body for an HTML email
+        """
+        # Create email
+        message = MIMEMultipart('alternative')
+        message['to'] = to_email
+        message['subject'] = subject
+        
+        # Add HTML body
+        html_part = MIMEText(body_html, 'html')
+        message.attach(html_part)
+        
+        # Encode for the API
+        return {'raw': _b64encode(message.as_bytes()).decode()}
+    
     def send_email(self, to_email, subject, body_html):
         """
         Send email (for urgent alerts and weekly summaries)
@@ -297,28 +690,11 @@ class GmailConnector:
             return False
         
         try:
-            import base64
-            from email.mime.text import MIMEText
-            from email.mime.multipart import MIMEMultipart
-            
             print(f"📤 Sending email to {to_email}...")
             
-            # Create email
-            message = MIMEMultipart('alternative')
-            message['to'] = to_email
-            message['subject'] = subject
-            
-            # Add HTML body
-            html_part = MIMEText(body_html, 'html')
-            message.attach(html_part)
-            
-            # Encode and send
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            send_message = {'raw': raw_message}
-            
             result = self.service.users().messages().send(
                 userId='me',
-                body=send_message
+                body=self._build_message(to_email, subject, body_html)
             ).execute()
             
             print(f"✅ Email sent successfully (ID: {result['id']})")
@@ -328,6 +704,43 @@ class GmailConnector:
             print(f"❌ Failed to send email: {str(e)}")
             return False
 
+    def send_email_batch(self, to_emails, subject, body_html):
+        """
+        Send the same email to each address through Gmail batch requests
+        Up to GMAIL_BATCH_SIZE sends travel in one HTTP round trip; every
+        recipient still gets their own message
+        Returns one sent-successfully flag per entry of to_emails, in order
+        """
+        results = [False] * len(to_emails)
+        if not self.service:
+            print("❌ Gmail service not initialized")
+            return results
+        
+        def on_sent(request_id, response, exception):
+            i = int(request_id)
+            if exception is not None:
+                logger.warning(f"Failed to send email to {to_emails[i]}: {exception}")
+            else:
+                results[i] = True
+        
+        print(f"📤 Sending email to {len(to_emails)} recipients...")
+        try:
+            for start in range(0, len(to_emails), GMAIL_BATCH_SIZE):
+                batch = self.service.new_batch_http_request(callback=on_sent)
+                for i in range(start, min(start + GMAIL_BATCH_SIZE, len(to_emails))):
+                    batch.add(
+                        self.service.users().messages().send(
+                            userId='me',
+                            body=self._build_message(to_emails[i], subject, body_html)
+                        ),
+                        request_id=str(i)   # Position in to_emails
+                    )
+                batch.execute()
+        except Exception as e:
+            print(f"❌ Failed to send emails: {str(e)}")
+        
+        return results
+
 # Educational Tip: Test this module independently
 if __name__ == "__main__":
     print("🧪 Testing GmailConnector independently...")
@@ -9,11 +9,181 @@ EDUCATIONAL CONCEPTS:
 - HTML Email: Professional formatting for email delivery
 """
 
+import re
 import json
+import time
+import heapq
+import hashlib
+from html import escape
+from operator import itemgetter
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
 from collections import defaultdict, Counter
 
+import numpy as np
+
+# Finished summaries (JSON data + rendered HTML) are reused for this long
+SUMMARY_CACHE_DIR = Path("output/cache")
+SUMMARY_CACHE_TTL = 6 * 60 * 60  # seconds
+
+# The parts of an urgent email the summary shows - the only ones written to the cache
+URGENT_ITEM_FIELDS = ('subject', 'category', 'urgency_score', 'summary')
+
+# Words in a medium-urgency subject/summary that make it an action item, compiled into one pattern
+# (no word boundaries: "payment" and "signature" count, as they always have)
+ACTION_KEYWORDS = ['respond', 'reply', 'sign', 'return', 'submit', 'pay', 'attend', 'confirm']
+_ACTION_RE = re.compile('|'.join(ACTION_KEYWORDS), re.IGNORECASE)
+
+# Urgency buckets: scores up to 3 are Low, up to 7 Medium, above that High
+URGENCY_CUTOFFS = (3, 7)
+URGENCY_BUCKETS = ('Low (0-3)', 'Medium (4-7)', 'High (8-10)')
+
+
+def _trunc(text: str, limit: int) -> str:
+    """
+    Shorten text to limit characters plus '...' (text that fits is returned as is)
+    """
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+# Static start of the weekly summary email (document head and styles)
+_HTML_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Sally 3.0 - Weekly Family Summary</title>
+    <style>
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }
+        .container { max-width: 600px; margin: 0 auto; background: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }
+        .header h1 { margin: 0; font-size: 28px; }
+        .header p { margin: 10px 0 0 0; opacity: 0.9; }
+        .content { padding: 30px; }
+        .overview { background: #f8f9fa; padding: 20px; border-radius: 6px; margin-bottom: 30px; }
+        .stats { display: flex; justify-content: space-around; text-align: center; }
+        .stat { flex: 1; }
+        .stat-number { font-size: 24px; font-weight: bold; color: #667eea; }
+        .stat-label { font-size: 12px; color: #666; text-transform: uppercase; }
+        .section { margin-bottom: 30px; }
+        .section h2 { color: #333; border-bottom: 2px solid #667eea; padding-bottom: 10px; }
+        .student-card { background: #fff; border: 1px solid #e0e0e0; border-radius: 6px; padding: 20px; margin-bottom: 20px; }
+        .student-name { font-size: 18px; font-weight: bold; color: #333; margin-bottom: 10px; }
+        .email-item { background: #f8f9fa; padding: 12px; border-left: 4px solid #667eea; margin-bottom: 10px; }
+        .urgent { border-left-color: #dc3545 !important; }
+        .medium { border-left-color: #ffc107 !important; }
+        .action-item { background: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 6px; margin-bottom: 15px; }
+        .action-priority-high { background: #f8d7da; border-color: #f5c6cb; }
+        .insight { background: #e3f2fd; border-left: 4px solid #2196f3; padding: 15px; margin-bottom: 15px; }
+        .footer { text-align: center; padding: 20px; color: #666; font-size: 12px; background: #f8f9fa; }
+        @media (max-width: 480px) { .stats { flex-direction: column; } .stat { margin-bottom: 15px; } }
+    </style>
+</head>
+<body>
+"""
+
+# Section templates, filled in with str.format_map by format_as_html_email
+_OVERVIEW_TMPL = """    <div class="container">
+        <div class="header">
+            <h1>🤖 Sally 3.0 Weekly Report</h1>
+            <p>Your AI School Communication Summary</p>
+            <p>{start_date} to {end_date}</p>
+        </div>
+        
+        <div class="content">
+            <!-- Overview Section -->
+            <div class="overview">
+                <div class="stats">
+                    <div class="stat">
+                        <div class="stat-number">{total_emails}</div>
+                        <div class="stat-label">Total Emails</div>
+                    </div>
+                    <div class="stat">
+                        <div class="stat-number">{urgent_count}</div>
+                        <div class="stat-label">Urgent Items</div>
+                    </div>
+                    <div class="stat">
+                        <div class="stat-number">{action_count}</div>
+                        <div class="stat-label">Action Items</div>
+                    </div>
+                    <div class="stat">
+                        <div class="stat-number">{schools}</div>
+                        <div class="stat-label">Schools</div>
+                    </div>
+                </div>
+            </div>
+"""
+
+_SECTION_CLOSE = "</div>"
+
+_INSIGHTS_OPEN = """
+            <div class="section">
+                <h2>💡 This Week's Insights</h2>
+"""
+_INSIGHT_TMPL = '<div class="insight">{insight}</div>'
+
+_URGENT_OPEN = """
+            <div class="section">
+                <h2>🚨 Urgent Items Requiring Attention</h2>
+"""
+_URGENT_ITEM_TMPL = """
+                <div class="email-item urgent">
+                    <strong>{subject}</strong><br>
+                    <small>Category: {category} | Urgency: {urgency:.1f}/10</small><br>
+                    {summary}
+                </div>
+"""
+
+_ACTIONS_OPEN = """
+            <div class="section">
+                <h2>📋 Action Items This Week</h2>
+"""
+_ACTION_ITEM_TMPL = """
+                <div class="{css_class}">
+                    <strong>{priority} Priority:</strong> {subject}<br>
+                    <small>Student: {student} | Category: {category}</small><br>
+                    {summary}
+                </div>
+"""
+
+_STUDENTS_OPEN = '<div class="section"><h2>👨‍👩‍👧‍👦 By Student</h2>'
+_STUDENT_CARD_TMPL = """
+                <div class="student-card">
+                    <div class="student-name">{name}</div>
+                    <p><strong>{total_emails} emails</strong> | Categories: {categories}</p>
+"""
+_STUDENT_EMAIL_TMPL = """
+                    <div class="email-item {css_class}">
+                        <strong>{subject}</strong> <small>({date})</small><br>
+                        <small>Category: {category} | Urgency: {urgency:.1f}/10</small>
+                    </div>
+"""
+
+_EVENTS_OPEN = """
+            <div class="section">
+                <h2>📅 Upcoming Events & Important Dates</h2>
+"""
+_EVENT_TMPL = """
+                <div class="email-item">
+                    <strong>{subject}</strong><br>
+                    <small>Student: {student} | Dates: {dates}</small><br>
+                    {summary}
+                </div>
+"""
+
+_FOOTER_TMPL = """
+        </div>
+        <div class="footer">
+            <p>📊 Generated by Sally 3.0 on {timestamp}</p>
+            <p>🤖 Your AI School Communication Assistant</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
 class SummaryGenerator:
     """
     Generates weekly family communication summaries
@@ -23,234 +193,365 @@ class SummaryGenerator:
     def __init__(self, config_manager, gmail_connector):
         self.config = config_manager
         self.gmail = gmail_connector
+        self._name_cache = {}   # Student code → real name, filled as codes are seen
+        self._analyzer = None   # Created on first use, then reused for every summary
         
         print("📊 SummaryGenerator initialized")
     
-    def generate_weekly_summary(self, days_back=7) -> Dict:
+    def generate_weekly_summary(self, days_back=7, use_cache=True) -> Dict:
         """
         Generate comprehensive weekly summary of school communications
         Returns structured data that can be formatted as email or report
+        
+        With use_cache, a summary for the same period generated earlier today
+        (within SUMMARY_CACHE_TTL) is reused instead of fetching and analyzing
+        again - emails that arrived since then are not in it, so anything that
+        sends the summary right away passes use_cache=False
         """
         
         print(f"📈 Generating weekly summary for last {days_back} days...")
         
-        # Get week's emails from Gmail
-        from ai_analyzer import AIAnalyzer
-        analyzer = AIAnalyzer(self.config)
+        # One clock reading for the whole summary (period and generation time)
+        now = datetime.now()
         
-        # Fetch and analyze week's emails
+        cache_key = self._summary_cache_key(days_back, now)
+        if use_cache:
+            cached = self._load_cached_summary(cache_key)
+            if cached:
+                print(f"✅ Reusing summary generated at {cached['generation_timestamp']}")
+                return cached
+        
+        # Names are cached per summary so a reloaded config is picked up next time
+        self._name_cache.clear()
+        
+        # Fetch week's emails from Gmail
         print("   📧 Fetching school emails...")
         weekly_emails = self.gmail.get_school_emails(days_back=days_back, max_results=50)
         
         if not weekly_emails:
             print("   📭 No emails found for this period")
-            return self._create_empty_summary()
+            return self._create_empty_summary(days_back, now)
         
         print(f"   🧠 Analyzing {len(weekly_emails)} emails...")
-        analyzed_emails = analyzer.analyze_email_batch(weekly_emails)
+        analyzed_emails = self._get_analyzer().analyze_email_batch(weekly_emails)
         
-        # Generate summary statistics
-        summary_data = self._create_summary_structure(analyzed_emails, days_back)
+        # Generate summary statistics (one pass over the emails)
+        facts = self._aggregate(analyzed_emails)
+        summary_data = self._create_summary_structure(facts, days_back, now)
         
         print("   📊 Generating insights and recommendations...")
-        summary_data['insights'] = self._generate_insights(analyzed_emails)
-        summary_data['action_items'] = self._extract_action_items(analyzed_emails)
-        summary_data['upcoming_events'] = self._identify_upcoming_events(analyzed_emails)
+        summary_data['insights'] = self._generate_insights(facts)
+        summary_data['action_items'] = self._extract_action_items(facts)
+        summary_data['upcoming_events'] = self._identify_upcoming_events(facts)
+        
+        summary_data['cache_key'] = cache_key
+        self._store_cached_summary(summary_data)
         
         print("✅ Weekly summary generation complete!")
         return summary_data
     
-    def _create_summary_structure(self, emails: List[Dict], days_back: int) -> Dict:
+    def _summary_cache_key(self, days_back: int, now: datetime) -> str:
         """
-        Create the basic summary data structure
+        Identify a summary by what it covers: period length, day, and monitored schools
         """
-        
-        # Group emails by student
+        schools = ','.join(self.config.schools)
+        return hashlib.sha1(f"{days_back}|{now.date().isoformat()}|{schools}".encode('utf-8')).hexdigest()
+    
+    def _summary_cache_paths(self, cache_key: str):
+        """
+        (JSON data path, HTML path) for a cached summary
+        """
+        base = SUMMARY_CACHE_DIR / f"summary_{cache_key}"
+        return base.with_suffix('.json'), base.with_suffix('.html')
+    
+    def _load_cached_summary(self, cache_key: str) -> Optional[Dict]:
+        """
+        Return a cached summary that is still fresh, or None
+        """
+        json_path, _ = self._summary_cache_paths(cache_key)
+        try:
+            if time.time() - json_path.stat().st_mtime > SUMMARY_CACHE_TTL:
+                return None
+            return json.loads(json_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None  # Not cached (or unreadable) - generate it
+    
+    def _store_cached_summary(self, summary_data: Dict):
+        """
+        Save summary data and its rendered HTML for reuse
+        Caching is best-effort - a failed write only means regenerating next time
+        """
+        json_path, html_path = self._summary_cache_paths(summary_data['cache_key'])
+        try:
+            SUMMARY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.writelines(self.iter_html_email(summary_data))
+            # Urgent items are whole emails - keep only what the summary shows, not their bodies
+            cached = {**summary_data, 'urgent_items': [
+                {field: item[field] for field in URGENT_ITEM_FIELDS if field in item}
+                for item in summary_data['urgent_items']
+            ]}
+            json_path.write_text(json.dumps(cached, default=str), encoding='utf-8')
+        except OSError as e:
+            print(f"⚠️ Could not cache weekly summary: {str(e)}")
+    
+    def _get_analyzer(self):
+        """
+        The AI analyzer, set up the first time there is something to analyze
+        and kept for later summaries (it holds the API client)
+        """
+        if self._analyzer is None:
+            from ai_analyzer import AIAnalyzer
+            self._analyzer = AIAnalyzer(self.config)
+        return self._analyzer
+    
+    def _real_name(self, code: str) -> str:
+        """
+        Real name for a student code, asking the config once per code
+        """
+        name = self._name_cache.get(code)
+        if name is None:
+            name = self.config.get_real_name(code)
+            self._name_cache[code] = name
+        return name
+    
+    def _period(self, days_back: int, now: datetime) -> Dict:
+        """
+        Reporting period ending now
+        """
+        return {
+            'start_date': (now - timedelta(days=days_back)).strftime('%Y-%m-%d'),
+            'end_date': now.strftime('%Y-%m-%d'),
+            'days': days_back
+        }
+    
+    def _aggregate(self, emails: List[Dict]) -> Dict:
+        """
+        Collect everything the summary needs from the emails
+        Urgency reductions are vectorized; grouping takes a single pass
+        Returns a "facts" dict that the summary sections read instead of rescanning emails
+        """
+        # Grouping and text fields in one pass; each email's students are parsed here only
+        category_counts = Counter()
         student_emails = defaultdict(list)
+        student_categories = defaultdict(lambda: defaultdict(int))   # code -> category -> count
+        student_urgent = defaultdict(int)                            # code -> urgency 7+ emails
         general_emails = []
+        schools = set()
+        student_names = []      # Display name(s) per email, same order as emails
+        calendar = []           # (email, student name, first 3 dates) for dated Calendar emails
         
         for email in emails:
+            category = email.get('category', 'Unknown')
+            category_counts[category] += 1
+            # Domain after the last '@' (the whole sender when there is none), without splitting
+            sender = email.get('sender', '')
+            schools.add(sender[sender.rfind('@') + 1:])
+            
             student = email.get('student_association', 'All Students')
             if student == 'All Students':
                 general_emails.append(email)
+                name = self._real_name(student)
             else:
                 # Handle multiple students (comma-separated)
-                students = [s.strip() for s in student.split(',')]
-                for s in students:
-                    student_emails[s].append(email)
+                codes = [s.strip() for s in student.split(',')]
+                urgent = email.get('urgency_score', 0) >= 7.0
+                for code in codes:
+                    student_emails[code].append(email)
+                    student_categories[code][category] += 1
+                    if urgent:
+                        student_urgent[code] += 1
+                name = ', '.join(self._real_name(code) for code in codes)
+            student_names.append(name)
+            
+            if category == 'Calendar':
+                # key_information is almost always a dict; anything else has no dates
+                try:
+                    dates = (email.get('key_information') or {}).get('dates') or []
+                except AttributeError:
+                    dates = []
+                if dates:
+                    calendar.append((email, name, dates[:3]))
+        
+        # Numeric work runs on an array of urgency scores
+        urgency = np.fromiter((email.get('urgency_score', 0) for email in emails),
+                              dtype=np.float64, count=len(emails))
+        # side='left' puts a score equal to a cutoff in the lower bucket
+        urgency_buckets = np.bincount(np.searchsorted(URGENCY_CUTOFFS, urgency, side='left'),
+                                      minlength=len(URGENCY_BUCKETS))
+        
+        # Urgency 7+ emails are urgent and automatically action items
+        urgent_idx = np.flatnonzero(urgency >= 7.0)
+        urgent_items = [emails[i] for i in urgent_idx]
+        high_actions = [(emails[i], student_names[i]) for i in urgent_idx]
+        
+        # Urgency 4-7 emails are action items when they mention an action word
+        medium_actions = []
+        for i in np.flatnonzero((urgency >= 4) & (urgency < 7.0)):
+            email = emails[i]
+            if _ACTION_RE.search(email.get('subject', '')) or _ACTION_RE.search(email.get('summary', '')):
+                medium_actions.append((email, student_names[i]))
         
-        # Count by categories and urgency
-        category_counts = Counter(email.get('category', 'Unknown') for email in emails)
-        urgency_counts = self._categorize_urgency_counts(emails)
+        return {
+            'total': len(emails),
+            'category_counts': category_counts,
+            'urgency_counts': dict(zip(URGENCY_BUCKETS, urgency_buckets.tolist())),
+            'urgent_items': urgent_items,
+            'high_actions': high_actions,       # (email, student name) pairs
+            'medium_actions': medium_actions,   # (email, student name) pairs
+            'calendar': calendar,               # (email, student name, dates) triples
+            'student_emails': student_emails,
+            'student_categories': student_categories,
+            'student_urgent': student_urgent,
+            'general_emails': general_emails,
+            'schools': schools
+        }
+    
+    def _create_summary_structure(self, facts: Dict, days_back: int, now: datetime) -> Dict:
+        """
+        Create the basic summary data structure from _aggregate's facts
+        now is the summary's generation time
+        """
         
         # Create summary structure
         summary = {
-            'period': {
-                'start_date': (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d'),
-                'end_date': datetime.now().strftime('%Y-%m-%d'),
-                'days': days_back
-            },
+            'period': self._period(days_back, now),
             'overview': {
-                'total_emails': len(emails),
-                'by_category': dict(category_counts),
-                'by_urgency': urgency_counts,
-                'schools_contacted': len(set(email.get('sender', '').split('@')[-1] for email in emails))
+                'total_emails': facts['total'],
+                'by_category': dict(facts['category_counts']),
+                'by_urgency': facts['urgency_counts'],
+                'schools_contacted': len(facts['schools'])
             },
             'by_student': {},
-            'general_communications': len(general_emails),
-            'urgent_items': [email for email in emails if email.get('urgency_score', 0) >= 7.0],
-            'generation_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'general_communications': len(facts['general_emails']),
+            'urgent_items': facts['urgent_items'],
+            'generation_timestamp': now.strftime('%Y-%m-%d %H:%M:%S')
         }
         
         # Create per-student summaries
-        for student_code, student_emails_list in student_emails.items():
-            real_name = self.config.get_real_name(student_code)
+        for student_code, student_emails_list in facts['student_emails'].items():
+            real_name = self._real_name(student_code)
+            
+            by_category = dict(facts['student_categories'][student_code])
             
             summary['by_student'][student_code] = {
                 'student_name': real_name,
                 'total_emails': len(student_emails_list),
-                'by_category': dict(Counter(email.get('category', 'Unknown') for email in student_emails_list)),
-                'urgent_count': sum(1 for email in student_emails_list if email.get('urgency_score', 0) >= 7.0),
+                'by_category': by_category,
+                'urgent_count': facts['student_urgent'][student_code],
                 'recent_emails': [
-                    {
-                        'subject': email.get('subject', 'No Subject')[:60] + '...' if len(email.get('subject', '')) > 60 else email.get('subject', 'No Subject'),
-                        'category': email.get('category', 'Unknown'),
-                        'urgency': email.get('urgency_score', 0),
-                        'date': email.get('timestamp', datetime.now()).strftime('%m/%d') if email.get('timestamp') else 'Unknown',
-                        'summary': email.get('summary', '')[:100] + '...' if len(email.get('summary', '')) > 100 else email.get('summary', '')
-                    }
-                    for email in sorted(student_emails_list, key=lambda x: x.get('urgency_score', 0), reverse=True)[:5]
+                    self._row(email)
+                    for email in heapq.nlargest(5, student_emails_list, key=lambda x: x.get('urgency_score', 0))
                 ]
             }
         
         return summary
     
-    def _categorize_urgency_counts(self, emails: List[Dict]) -> Dict[str, int]:
+    @staticmethod
+    def _row(email: Dict) -> Dict:
         """
-        Categorize emails by urgency levels for summary
+        One student's recent email as shown in the summary (long text truncated)
+        Each field is read from the email once
         """
-        counts = {'Low (0-3)': 0, 'Medium (4-7)': 0, 'High (8-10)': 0}
+        subject = email.get('subject', 'No Subject')
+        summary = email.get('summary', '')
+        timestamp = email.get('timestamp')
         
-        for email in emails:
-            urgency = email.get('urgency_score', 0)
-            if urgency <= 3:
-                counts['Low (0-3)'] += 1
-            elif urgency <= 7:
-                counts['Medium (4-7)'] += 1
-            else:
-                counts['High (8-10)'] += 1
-        
-        return counts
+        return {
+            'subject': _trunc(subject, 60),
+            'category': email.get('category', 'Unknown'),
+            'urgency': email.get('urgency_score', 0),
+            'date': timestamp.strftime('%m/%d') if timestamp else 'Unknown',
+            'summary': _trunc(summary, 100)
+        }
     
-    def _generate_insights(self, emails: List[Dict]) -> List[str]:
+    def _generate_insights(self, facts: Dict) -> List[str]:
         """
         Generate AI-powered insights from the week's communications
+        Reads the counts _aggregate already took - no pass over the emails
         """
         insights = []
+        total = facts['total']
         
         # Communication volume insight
-        if len(emails) > 20:
-            insights.append(f"📈 High communication week with {len(emails)} emails - consider prioritizing urgent items")
-        elif len(emails) < 5:
+        if total > 20:
+            insights.append(f"📈 High communication week with {total} emails - consider prioritizing urgent items")
+        elif total < 5:
             insights.append("📉 Quiet communication week - good time to catch up on any pending items")
         
         # Category distribution insights
-        categories = Counter(email.get('category', 'Unknown') for email in emails)
-        most_common = categories.most_common(1)
+        most_common = facts['category_counts'].most_common(1)
         if most_common:
             category, count = most_common[0]
-            if count > len(emails) * 0.5:
-                insights.append(f"🎯 {category} communications dominated this week ({count}/{len(emails)} emails)")
+            if count > total * 0.5:
+                insights.append(f"🎯 {category} communications dominated this week ({count}/{total} emails)")
         
         # Urgency pattern insights
-        urgent_count = sum(1 for email in emails if email.get('urgency_score', 0) >= 7.0)
+        urgent_count = len(facts['urgent_items'])
         if urgent_count > 3:
             insights.append(f"🚨 Multiple urgent items this week ({urgent_count}) - may need immediate family discussion")
         elif urgent_count == 0:
             insights.append("✅ No urgent communications this week - good opportunity for planning ahead")
         
         # Financial communications insight
-        financial_count = sum(1 for email in emails if email.get('category') == 'Financial')
+        financial_count = facts['category_counts']['Financial']
         if financial_count > 2:
             insights.append(f"💰 Multiple financial communications ({financial_count}) - review payment deadlines")
         
         return insights
     
-    def _extract_action_items(self, emails: List[Dict]) -> List[Dict]:
+    def _extract_action_items(self, facts: Dict) -> List[Dict]:
         """
         Extract actionable items that require parent response
+        High urgency emails are automatic action items; medium urgency
+        ones count when they mention a specific action (see _aggregate)
         """
         action_items = []
         
-        # High urgency emails are automatic action items
-        for email in emails:
-            if email.get('urgency_score', 0) >= 7.0:
+        for priority, candidates in (('High', facts['high_actions']), ('Medium', facts['medium_actions'])):
+            for email, student_name in candidates:
                 action_items.append({
-                    'priority': 'High',
+                    'priority': priority,
                     'subject': email.get('subject', 'No Subject'),
                     'category': email.get('category', 'Unknown'),
-                    'student': self.config.get_real_name(email.get('student_association', 'All Students')),
-                    'summary': email.get('summary', '')[:100] + '...' if len(email.get('summary', '')) > 100 else email.get('summary', ''),
+                    'student': student_name,
+                    'summary': email.get('summary', ''),
                     'urgency_score': email.get('urgency_score', 0)
                 })
         
-        # Medium urgency items that mention specific actions
-        action_keywords = ['respond', 'reply', 'sign', 'return', 'submit', 'pay', 'attend', 'confirm']
-        for email in emails:
-            if 4 <= email.get('urgency_score', 0) < 7:
-                subject_lower = email.get('subject', '').lower()
-                summary_lower = email.get('summary', '').lower()
-                
-                if any(keyword in subject_lower or keyword in summary_lower for keyword in action_keywords):
-                    action_items.append({
-                        'priority': 'Medium',
-                        'subject': email.get('subject', 'No Subject'),
-                        'category': email.get('category', 'Unknown'),
-                        'student': self.config.get_real_name(email.get('student_association', 'All Students')),
-                        'summary': email.get('summary', '')[:100] + '...' if len(email.get('summary', '')) > 100 else email.get('summary', ''),
-                        'urgency_score': email.get('urgency_score', 0)
-                    })
+        # Top 10 action items by urgency score (highest first)
+        top_items = heapq.nlargest(10, action_items, key=itemgetter('urgency_score'))
         
-        # Sort by urgency score (highest first)
-        action_items.sort(key=lambda x: x['urgency_score'], reverse=True)
+        # Only the items kept have their summary shortened
+        for item in top_items:
+            item['summary'] = _trunc(item['summary'], 100)
         
-        return action_items[:10]  # Limit to top 10 action items
+        return top_items
     
-    def _identify_upcoming_events(self, emails: List[Dict]) -> List[Dict]:
+    def _identify_upcoming_events(self, facts: Dict) -> List[Dict]:
         """
         Identify upcoming events and important dates from email content
+        Calendar emails with dates (first 3 kept) were picked out by _aggregate
         """
         events = []
         
-        # Look for calendar-related emails
-        calendar_emails = [email for email in emails if email.get('category') == 'Calendar']
-        
-        for email in calendar_emails:
-            # Extract dates from key_information if available
-            key_info = email.get('key_information', {})
-            dates = key_info.get('dates', []) if isinstance(key_info, dict) else []
-            
-            if dates:
-                events.append({
-                    'subject': email.get('subject', 'No Subject'),
-                    'student': self.config.get_real_name(email.get('student_association', 'All Students')),
-                    'dates': dates[:3],  # Limit to first 3 dates
-                    'category': email.get('category', 'Calendar'),
-                    'summary': email.get('summary', '')[:80] + '...' if len(email.get('summary', '')) > 80 else email.get('summary', '')
-                })
+        for email, student_name, dates in facts['calendar']:
+            events.append({
+                'subject': email.get('subject', 'No Subject'),
+                'student': student_name,
+                'dates': dates,
+                'category': email.get('category', 'Calendar'),
+                'summary': _trunc(email.get('summary', ''), 80)
+            })
         
         return events[:8]  # Limit to 8 upcoming events
     
-    def _create_empty_summary(self) -> Dict:
+    def _create_empty_summary(self, days_back: int, now: datetime) -> Dict:
         """
         Create summary structure when no emails found
         """
         return {
-            'period': {
-                'start_date': (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'),
-                'end_date': datetime.now().strftime('%Y-%m-%d'),
-                'days': 7
-            },
+            'period': self._period(days_back, now),
             'overview': {
                 'total_emails': 0,
                 'by_category': {},
@@ -263,7 +564,7 @@ class SummaryGenerator:
             'insights': ['📭 No school communications this week - enjoy the quiet time!'],
             'action_items': [],
             'upcoming_events': [],
-            'generation_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'generation_timestamp': now.strftime('%Y-%m-%d %H:%M:%S')
         }
 
     
@@ -272,167 +573,98 @@ class SummaryGenerator:
         Convert summary data to beautiful HTML email format
         Family-friendly, mobile-responsive design
         """
+        return ''.join(self.iter_html_email(summary_data))
+    
+    def iter_html_email(self, summary_data: Dict) -> Iterator[str]:
+        """
+        Yield the HTML email piece by piece, so it can be written out
+        without holding the whole document in memory
+        The markup lives in the module-level templates above; this fills them in,
+        HTML-escaping text from the emails and the analysis as it goes in
+        """
         
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sally 3.0 - Weekly Family Summary</title>
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-        .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .header h1 {{ margin: 0; font-size: 28px; }}
-        .header p {{ margin: 10px 0 0 0; opacity: 0.9; }}
-        .content {{ padding: 30px; }}
-        .overview {{ background: #f8f9fa; padding: 20px; border-radius: 6px; margin-bottom: 30px; }}
-        .stats {{ display: flex; justify-content: space-around; text-align: center; }}
-        .stat {{ flex: 1; }}
-        .stat-number {{ font-size: 24px; font-weight: bold; color: #667eea; }}
-        .stat-label {{ font-size: 12px; color: #666; text-transform: uppercase; }}
-        .section {{ margin-bottom: 30px; }}
-        .section h2 {{ color: #333; border-bottom: 2px solid #667eea; padding-bottom: 10px; }}
-        .student-card {{ background: #fff; border: 1px solid #e0e0e0; border-radius: 6px; padding: 20px; margin-bottom: 20px; }}
-        .student-name {{ font-size: 18px; font-weight: bold; color: #333; margin-bottom: 10px; }}
-        .email-item {{ background: #f8f9fa; padding: 12px; border-left: 4px solid #667eea; margin-bottom: 10px; }}
-        .urgent {{ border-left-color: #dc3545 !important; }}
-        .medium {{ border-left-color: #ffc107 !important; }}
-        .action-item {{ background: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; border-radius: 6px; margin-bottom: 15px; }}
-        .action-priority-high {{ background: #f8d7da; border-color: #f5c6cb; }}
-        .insight {{ background: #e3f2fd; border-left: 4px solid #2196f3; padding: 15px; margin-bottom: 15px; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; background: #f8f9fa; }}
-        @media (max-width: 480px) {{ .stats {{ flex-direction: column; }} .stat {{ margin-bottom: 15px; }} }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🤖 Sally 3.0 Weekly Report</h1>
-            <p>Your AI School Communication Summary</p>
-            <p>{summary_data['period']['start_date']} to {summary_data['period']['end_date']}</p>
-        </div>
-        
-        <div class="content">
-            <!-- Overview Section -->
-            <div class="overview">
-                <div class="stats">
-                    <div class="stat">
-                        <div class="stat-number">{summary_data['overview']['total_emails']}</div>
-                        <div class="stat-label">Total Emails</div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-number">{len(summary_data['urgent_items'])}</div>
-                        <div class="stat-label">Urgent Items</div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-number">{len(summary_data['action_items'])}</div>
-                        <div class="stat-label">Action Items</div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-number">{summary_data['overview']['schools_contacted']}</div>
-                        <div class="stat-label">Schools</div>
-                    </div>
-                </div>
-            </div>
-"""
+        yield _HTML_HEAD
+        yield _OVERVIEW_TMPL.format_map({
+            'start_date': summary_data['period']['start_date'],
+            'end_date': summary_data['period']['end_date'],
+            'total_emails': summary_data['overview']['total_emails'],
+            'urgent_count': len(summary_data['urgent_items']),
+            'action_count': len(summary_data['action_items']),
+            'schools': summary_data['overview']['schools_contacted']
+        })
         
         # Add insights section
         if summary_data.get('insights'):
-            html += """
-            <div class="section">
-                <h2>💡 This Week's Insights</h2>
-"""
+            yield _INSIGHTS_OPEN
             for insight in summary_data['insights']:
-                html += f'<div class="insight">{insight}</div>'
-            html += "</div>"
+                yield _INSIGHT_TMPL.format_map({'insight': escape(insight)})
+            yield _SECTION_CLOSE
         
         # Add urgent items section
         if summary_data['urgent_items']:
-            html += """
-            <div class="section">
-                <h2>🚨 Urgent Items Requiring Attention</h2>
-"""
+            yield _URGENT_OPEN
             for item in summary_data['urgent_items']:
-                html += f"""
-                <div class="email-item urgent">
-                    <strong>{item.get('subject', 'No Subject')}</strong><br>
-                    <small>Category: {item.get('category', 'Unknown')} | Urgency: {item.get('urgency_score', 0):.1f}/10</small><br>
-                    {item.get('summary', '')[:150] + '...' if len(item.get('summary', '')) > 150 else item.get('summary', '')}
-                </div>
-"""
-            html += "</div>"
+                yield _URGENT_ITEM_TMPL.format_map({
+                    'subject': escape(item.get('subject', 'No Subject')),
+                    'category': escape(item.get('category', 'Unknown')),
+                    'urgency': item.get('urgency_score', 0),
+                    'summary': escape(_trunc(item.get('summary', ''), 150))
+                })
+            yield _SECTION_CLOSE
         
         # Add action items section
         if summary_data.get('action_items'):
-            html += """
-            <div class="section">
-                <h2>📋 Action Items This Week</h2>
-"""
+            yield _ACTIONS_OPEN
             for item in summary_data['action_items']:
-                priority_class = 'action-priority-high' if item.get('priority') == 'High' else 'action-item'
-                html += f"""
-                <div class="{priority_class}">
-                    <strong>{item.get('priority', 'Medium')} Priority:</strong> {item.get('subject', 'No Subject')}<br>
-                    <small>Student: {item.get('student', 'All')} | Category: {item.get('category', 'Unknown')}</small><br>
-                    {item.get('summary', '')[:120] + '...' if len(item.get('summary', '')) > 120 else item.get('summary', '')}
-                </div>
-"""
-            html += "</div>"
+                yield _ACTION_ITEM_TMPL.format_map({
+                    'css_class': 'action-priority-high' if item.get('priority') == 'High' else 'action-item',
+                    'priority': escape(item.get('priority', 'Medium')),
+                    'subject': escape(item.get('subject', 'No Subject')),
+                    'student': escape(item.get('student', '')),
+                    'category': escape(item.get('category', 'Unknown')),
+                    'summary': escape(item.get('summary', ''))
+                })
+            yield _SECTION_CLOSE
         
         # Add per-student sections
         if summary_data.get('by_student'):
-            html += '<div class="section"><h2>👨‍👩‍👧‍👦 By Student</h2>'
+            yield _STUDENTS_OPEN
             
             for student_code, student_data in summary_data['by_student'].items():
-                html += f"""
-                <div class="student-card">
-                    <div class="student-name">{student_data['student_name']}</div>
-                    <p><strong>{student_data['total_emails']} emails</strong> | Categories: {', '.join(f"{k}: {v}" for k, v in student_data['by_category'].items())}</p>
-"""
+                by_category = student_data.get('by_category', {})
+                yield _STUDENT_CARD_TMPL.format_map({
+                    'name': escape(student_data.get('student_name', student_code)),
+                    'total_emails': student_data.get('total_emails', 0),
+                    'categories': escape(', '.join(f"{k}: {v}" for k, v in by_category.items()))
+                })
                 
                 # Add recent emails for this student
                 for email in student_data.get('recent_emails', [])[:3]:  # Show top 3
-                    urgency_class = 'urgent' if email.get('urgency', 0) >= 7 else 'medium' if email.get('urgency', 0) >= 4 else ''
-                    html += f"""
-                    <div class="email-item {urgency_class}">
-                        <strong>{email.get('subject', 'No Subject')}</strong> <small>({email.get('date', 'Unknown')})</small><br>
-                        <small>Category: {email.get('category', 'Unknown')} | Urgency: {email.get('urgency', 0):.1f}/10</small>
-                    </div>
-"""
-                html += "</div>"
-            html += "</div>"
+                    urgency = email.get('urgency', 0)
+                    yield _STUDENT_EMAIL_TMPL.format_map({
+                        'css_class': 'urgent' if urgency >= 7 else 'medium' if urgency >= 4 else '',
+                        'subject': escape(email.get('subject', 'No Subject')),
+                        'date': escape(email.get('date', 'Unknown')),
+                        'category': escape(email.get('category', 'Unknown')),
+                        'urgency': urgency
+                    })
+                yield _SECTION_CLOSE
+            yield _SECTION_CLOSE
         
         # Add upcoming events
         if summary_data.get('upcoming_events'):
-            html += """
-            <div class="section">
-                <h2>📅 Upcoming Events & Important Dates</h2>
-"""
+            yield _EVENTS_OPEN
             for event in summary_data['upcoming_events']:
-                html += f"""
-                <div class="email-item">
-                    <strong>{event.get('subject', 'No Subject')}</strong><br>
-                    <small>Student: {event.get('student', 'All')} | Dates: {', '.join(event.get('dates', []))}</small><br>
-                    {event.get('summary', '')}
-                </div>
-"""
-            html += "</div>"
+                yield _EVENT_TMPL.format_map({
+                    'subject': escape(event.get('subject', 'No Subject')),
+                    'student': escape(event.get('student', '')),
+                    'dates': escape(', '.join(event.get('dates', []))),
+                    'summary': escape(event.get('summary', ''))
+                })
+            yield _SECTION_CLOSE
         
         # Footer
-        html += f"""
-        </div>
-        <div class="footer">
-            <p>📊 Generated by Sally 3.0 on {summary_data['generation_timestamp']}</p>
-            <p>🤖 Your AI School Communication Assistant</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-        
-        return html
+        yield _FOOTER_TMPL.format_map({'timestamp': summary_data['generation_timestamp']})
 
     
     def send_weekly_summary_email(self, summary_data: Dict) -> bool:
@@ -451,8 +683,16 @@ class SummaryGenerator:
             print("⚠️ No summary email recipients configured")
             return False
         
-        # Generate HTML email
-        html_content = self.format_as_html_email(summary_data)
+        # Generate HTML email (reusing the cached rendering when there is one)
+        html_content = None
+        if summary_data.get('cache_key'):
+            _, html_path = self._summary_cache_paths(summary_data['cache_key'])
+            try:
+                html_content = html_path.read_text(encoding='utf-8')
+            except OSError:
+                pass
+        if html_content is None:
+            html_content = self.format_as_html_email(summary_data)
         
         # Create subject line
         total_emails = summary_data['overview']['total_emails']
@@ -463,76 +703,79 @@ class SummaryGenerator:
         else:
             subject = f"📊 Sally 3.0 Weekly Summary: {total_emails} school emails"
         
-        # Send to all recipients
+        recipient_emails = [
+            recipient.get('email') if isinstance(recipient, dict) else recipient
+            for recipient in summary_recipients
+        ]
+        
+        # Send to all recipients in one Gmail batch request (each still gets their own email)
         success_count = 0
-        for recipient in summary_recipients:
-            recipient_email = recipient.get('email') if isinstance(recipient, dict) else recipient
-            
-            try:
-                if self.gmail.send_email(recipient_email, subject, html_content):
-                    success_count += 1
-                    print(f"   ✅ Sent to {recipient_email}")
-                else:
-                    print(f"   ❌ Failed to send to {recipient_email}")
-            except Exception as e:
-                print(f"   ❌ Error sending to {recipient_email}: {str(e)}")
-        
-        print(f"📧 Summary email sent to {success_count}/{len(summary_recipients)} recipients")
+        results = self.gmail.send_email_batch(recipient_emails, subject, html_content)
+        for recipient_email, sent in zip(recipient_emails, results):
+            if sent:
+                success_count += 1
+                print(f"   ✅ Sent to {recipient_email}")
+            else:
+                print(f"   ❌ Failed to send to {recipient_email}")
+        
+        print(f"📧 Summary email sent to {success_count}/{len(recipient_emails)} recipients")
         return success_count > 0
 
-    # Educational testing function
-    if __name__ == "__main__":
-        print("🧪 Testing SummaryGenerator independently...")
-        
-        # Import required modules
-        import sys
-        sys.path.append('.')
-        from config_manager import ConfigManager
-        from gmail_connector import GmailConnector
-        
-        # Initialize components
-        config = ConfigManager()
-        config.load_all_configs()
-        
-        gmail = GmailConnector(config)
-        
-        if gmail.authenticate() and gmail.test_connection():
-            print("📊 Testing weekly summary generation...")
-            
-            # Create summary generator
-            summary_gen = SummaryGenerator(config, gmail)
-            
-            # Generate summary for last 7 days
-            summary_data = summary_gen.generate_weekly_summary(days_back=7)
-            
-            # Display results
-            print(f"\n📈 Weekly Summary Results:")
-            print("=" * 50)
-            print(f"Total emails: {summary_data['overview']['total_emails']}")
-            print(f"Categories: {summary_data['overview']['by_category']}")
-            print(f"Urgency distribution: {summary_data['overview']['by_urgency']}")
-            print(f"Urgent items: {len(summary_data['urgent_items'])}")
-            print(f"Action items: {len(summary_data['action_items'])}")
-            print(f"Insights generated: {len(summary_data['insights'])}")
-            
-            # Show insights
-            if summary_data['insights']:
-                print(f"\n💡 This Week's Insights:")
-                for insight in summary_data['insights']:
-                    print(f"   • {insight}")
-            
-            # Test HTML generation
-            print(f"\n📧 Testing HTML email generation...")
-            html_email = summary_gen.format_as_html_email(summary_data)
-            print(f"   ✅ HTML email generated ({len(html_email)} characters)")
-            
-            # Save HTML for preview
-            with open('output/sample_weekly_summary.html', 'w', encoding='utf-8') as f:
-                f.write(html_email)
-            print(f"   💾 Sample HTML saved to output/sample_weekly_summary.html")
-            
-            print("\n🎉 Weekly Summary Generator test complete!")
-            
-        else:
-            print("❌ Gmail connection failed - cannot test summary generation")
+
+# Educational testing function
+if __name__ == "__main__":
+    print("🧪 Testing SummaryGenerator independently...")
+    
+    # Import required modules
+    import sys
+    sys.path.append('.')
+    from config_manager import ConfigManager
+    from gmail_connector import GmailConnector
+    
+    # Initialize components
+    config = ConfigManager()
+    config.load_all_configs()
+    
+    gmail = GmailConnector(config)
+    
+    if gmail.authenticate() and gmail.test_connection():
+        print("📊 Testing weekly summary generation...")
+        
+        # Create summary generator
+        summary_gen = SummaryGenerator(config, gmail)
+        
+        # Generate summary for last 7 days
+        summary_data = summary_gen.generate_weekly_summary(days_back=7)
+        
+        # Display results
+        print(f"\n📈 Weekly Summary Results:")
+        print("=" * 50)
+        print(f"Total emails: {summary_data['overview']['total_emails']}")
+        print(f"Categories: {summary_data['overview']['by_category']}")
+        print(f"Urgency distribution: {summary_data['overview']['by_urgency']}")
+        print(f"Urgent items: {len(summary_data['urgent_items'])}")
+        print(f"Action items: {len(summary_data['action_items'])}")
+        print(f"Insights generated: {len(summary_data['insights'])}")
+        
+        # Show insights
+        if summary_data['insights']:
+            print(f"\n💡 This Week's Insights:")
+            for insight in summary_data['insights']:
+                print(f"   • {insight}")
+        
+        # Test HTML generation
+        print(f"\n📧 Testing HTML email generation...")
+        # Save HTML for preview, written as it is generated
+        html_size = 0
+        with open('output/sample_weekly_summary.html', 'w', encoding='utf-8') as f:
+            for chunk in summary_gen.iter_html_email(summary_data):
+                f.write(chunk)
+                html_size += len(chunk)
+        print(f"   ✅ HTML email generated ({html_size} characters)")
+        print(f"   💾 Sample HTML saved to output/sample_weekly_summary.html")
+        
+        print("\n🎉 Weekly Summary Generator test complete!")
+        
+    else:
+        print("❌ Gmail connection failed - cannot test summary generation")
 